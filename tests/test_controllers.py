@@ -8,6 +8,7 @@ import os
 import tempfile
 import shutil
 import json
+import time
 from unittest.mock import Mock, patch, MagicMock
 from typing import Dict, Any
 
@@ -16,9 +17,9 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from ui.controllers.base_controller import BaseController, ControllerState, ControllerEvent, ControllerRegistry
-from ui.controllers.config_controller import ConfigController
+from ui.controllers.config_controller import ConfigController, _config_fingerprint
 from ui.controllers.novel_controller import NovelController
-from ui.controllers.generation_controller import GenerationController
+from ui.controllers.generation_controller import GenerationController, GenerationCache
 
 
 class TestController(BaseController):
@@ -106,6 +107,46 @@ class TestBaseController(unittest.TestCase):
         # 验证事件不再被接收
         self.assertEqual(len(events), 1)
     
+    def test_batch_events(self):
+        """测试批量事件在退出上下文时统一分发"""
+        events = []
+        self.controller.add_event_listener("test_event", events.append)
+        
+        with self.controller.batch_events():
+            for i in range(3):
+                self.controller.emit_event(ControllerEvent(
+                    event_type="test_event",
+                    source="TestController",
+                    data=i
+                ))
+            self.assertEqual(events, [])
+        
+        self.assertEqual([event.data for event in events], [0, 1, 2])
+        
+        # 批次内完全相同的事件只分发一次
+        events.clear()
+        with self.controller.batch_events():
+            for _ in range(3):
+                self.controller.emit_event(ControllerEvent(
+                    event_type="test_event",
+                    source="TestController",
+                    data="same"
+                ))
+        self.assertEqual(len(events), 1)
+    
+    def test_emit_skips_without_listeners(self):
+        """测试无监听器时不创建事件"""
+        self.assertFalse(self.controller.has_listeners("test_event"))
+        with patch("ui.controllers.base_controller.ControllerEvent") as mock_event:
+            self.controller._emit("test_event", 1)
+        mock_event.assert_not_called()
+        
+        events = []
+        self.controller.add_event_listener("test_event", events.append)
+        self.assertTrue(self.controller.has_listeners("test_event"))
+        self.controller._emit("test_event", 1)
+        self.assertEqual([event.data for event in events], [1])
+    
     def test_error_handling(self):
         """测试错误处理"""
         with patch.object(self.controller, 'logger') as mock_logger:
@@ -117,6 +158,27 @@ class TestBaseController(unittest.TestCase):
             
             # 验证状态被设置为错误
             self.assertEqual(self.controller.state, ControllerState.ERROR)
+    
+    def test_error_handlers(self):
+        """测试错误处理器的添加与移除"""
+        calls = []
+        def failing_handler(error, context):
+            raise RuntimeError("handler failed")
+        def recording_handler(error, context):
+            calls.append((error, context))
+        
+        self.controller.add_error_handler(failing_handler)
+        self.controller.add_error_handler(recording_handler)
+        test_error = Exception("测试错误")
+        self.controller._handle_error(test_error, "测试操作")
+        
+        # 前一个处理器失败不影响后续处理器
+        self.assertEqual(calls, [(test_error, "测试操作")])
+        
+        # 移除后不再调用
+        self.controller.remove_error_handler(recording_handler)
+        self.controller._handle_error(test_error, "测试操作")
+        self.assertEqual(len(calls), 1)
 
 
 class TestControllerRegistry(unittest.TestCase):
@@ -139,6 +201,46 @@ class TestControllerRegistry(unittest.TestCase):
         self.registry.unregister("Controller1")
         self.assertIsNone(self.registry.get("Controller1"))
     
+    def test_unregister_cleans_up_without_loop(self):
+        """测试无事件循环时注销控制器会同步完成清理"""
+        cleaned = []
+        async def record_cleanup():
+            cleaned.append("Controller1")
+        self.controller1.cleanup = record_cleanup
+        
+        self.registry.register(self.controller1)
+        self.registry.unregister("Controller1")
+        self.assertEqual(cleaned, ["Controller1"])
+    
+    def test_unregister_reuses_cleanup_loop(self):
+        """测试无事件循环时多次注销复用同一个清理事件循环"""
+        self.registry.register(self.controller1)
+        self.registry.register(self.controller2)
+        self.addCleanup(self.registry._close_cleanup_loop)
+        
+        with patch("asyncio.new_event_loop", wraps=asyncio.new_event_loop) as mock_new_loop:
+            self.registry.unregister("Controller1")
+            self.registry.unregister("Controller2")
+        
+        self.assertEqual(mock_new_loop.call_count, 1)
+        self.assertEqual(len(self.registry.get_all()), 0)
+    
+    def test_cleanup_all_mixed_cleanup(self):
+        """测试cleanup_all兼容同步cleanup，单个控制器出错不影响其余控制器"""
+        cleaned = []
+        def sync_cleanup():
+            cleaned.append("Controller1")
+        async def failing_cleanup():
+            raise RuntimeError("boom")
+        self.controller1.cleanup = sync_cleanup
+        self.controller2.cleanup = failing_cleanup
+        controller3 = TestController("Controller3")
+        
+        for controller in (self.controller1, self.controller2, controller3):
+            self.registry.register(controller)
+        asyncio.run(self.registry.cleanup_all())
+        self.assertEqual(cleaned, ["Controller1"])
+    
     def test_get_all_controllers(self):
         """测试获取所有控制器"""
         self.registry.register(self.controller1)
@@ -175,6 +277,21 @@ class TestConfigController(unittest.TestCase):
         
         asyncio.run(run_test())
     
+    def test_initialize_notifies_each_state_once(self):
+        """测试初始化与加载配置嵌套时每个状态只通知一次"""
+        self.mock_model.load_configuration.return_value = True
+        self.mock_model._get_current_config.return_value = {
+            "llm_configs": {"test_llm": {"model_name": "gpt-3.5-turbo"}},
+            "embedding_configs": {"OpenAI": {"model_name": "text-embedding-ada-002"}}
+        }
+        states = []
+        self.controller.add_event_listener(
+            "state_changed", lambda event: states.append(event.data["new_state"])
+        )
+        
+        self.assertTrue(asyncio.run(self.controller.initialize()))
+        self.assertEqual(states, [ControllerState.PROCESSING, ControllerState.COMPLETED])
+    
     def test_add_llm_config(self):
         """测试添加LLM配置"""
         config_data = {
@@ -214,6 +331,141 @@ class TestConfigController(unittest.TestCase):
         }
         self.assertFalse(self.controller._validate_llm_config(invalid_config))
     
+    def test_iter_validate_llm_configs(self):
+        """测试批量验证LLM配置只返回无效项"""
+        valid_config = {
+            "interface_format": "OpenAI",
+            "api_key": "",
+            "base_url": "https://api.test.com",
+            "model_name": "gpt-3.5-turbo"
+        }
+        errors = self.controller._iter_validate_llm_configs({
+            "valid": valid_config,
+            "empty_model": dict(valid_config, model_name=""),
+            "bad_temperature": dict(valid_config, temperature=5)
+        })
+        self.assertEqual([name for name, _ in errors], ["empty_model", "bad_temperature"])
+        self.assertIn("model_name", errors[0][1])
+    
+    def test_all_configurations(self):
+        """测试并发测试LLM与嵌入模型配置"""
+        self.controller._config_cache = {
+            "llm_configs": {
+                "test_llm": {
+                    "interface_format": "OpenAI",
+                    "api_key": "test_key",
+                    "base_url": "https://api.test.com",
+                    "model_name": "gpt-3.5-turbo"
+                }
+            },
+            "embedding_configs": {
+                "OpenAI": {
+                    "interface_format": "OpenAI",
+                    "api_key": "test_key",
+                    "base_url": "https://api.test.com",
+                    "model_name": "text-embedding-ada-002"
+                }
+            }
+        }
+        
+        states = []
+        self.controller.add_event_listener(
+            "state_changed", lambda event: states.append(event.data["new_state"])
+        )
+        
+        with patch("config_manager.test_llm_config", return_value=True), \
+             patch("config_manager.test_embedding_config", return_value=True):
+            result = asyncio.run(self.controller.test_all_configurations("test_llm", "OpenAI"))
+        
+        self.assertTrue(result)
+        # 状态只在全部测试结束后设置一次
+        self.assertEqual(states, [ControllerState.PROCESSING, ControllerState.COMPLETED])
+    
+    def test_config_cache_does_not_mutate_input(self):
+        """测试设置配置缓存不修改传入字典，null子配置按空字典处理"""
+        config_data = {"llm_configs": None}
+        self.controller._config_cache = config_data
+        
+        self.assertEqual(config_data, {"llm_configs": None})
+        self.assertEqual(self.controller.get_all_llm_configs(), {})
+        self.assertEqual(self.controller.get_all_embedding_configs(), {})
+    
+    def test_save_configuration_skips_unchanged(self):
+        """测试配置未变化时跳过重复保存"""
+        config_data = {
+            "llm_configs": {"test_llm": {"model_name": "gpt-3.5-turbo"}},
+            "embedding_configs": {"OpenAI": {"model_name": "text-embedding-ada-002"}}
+        }
+        self.mock_model.save_config.return_value = True
+        
+        self.assertTrue(asyncio.run(self.controller.save_configuration(config_data)))
+        self.assertTrue(asyncio.run(self.controller.save_configuration(dict(config_data))))
+        self.assertEqual(self.mock_model.save_config.call_count, 1)
+        
+        # 内容变化后重新写入
+        config_data["llm_configs"]["other_llm"] = {"model_name": "gpt-4o-mini"}
+        self.assertTrue(asyncio.run(self.controller.save_configuration(config_data)))
+        self.assertEqual(self.mock_model.save_config.call_count, 2)
+        
+        # 其他途径写入配置文件后，相同内容也要重新写入
+        self.controller._config_cache = config_data
+        self.assertTrue(self.controller.remove_llm_config("other_llm"))
+        config_data["llm_configs"]["other_llm"] = {"model_name": "gpt-4o-mini"}
+        self.assertTrue(asyncio.run(self.controller.save_configuration(config_data)))
+        self.assertEqual(self.mock_model.save_config.call_count, 3)
+    
+    def test_llm_test_result_cached(self):
+        """测试短时间内重复测试同一LLM配置时复用成功结果"""
+        self.controller._config_cache = {
+            "llm_configs": {
+                "test_llm": {
+                    "interface_format": "OpenAI",
+                    "api_key": "test_key",
+                    "base_url": "https://api.test.com",
+                    "model_name": "gpt-3.5-turbo"
+                }
+            }
+        }
+        
+        with patch("config_manager.test_llm_config", return_value=True) as mock_test:
+            self.assertTrue(asyncio.run(self.controller.test_llm_configuration("test_llm")))
+            self.assertTrue(asyncio.run(self.controller.test_llm_configuration("test_llm")))
+            self.assertEqual(mock_test.call_count, 1)
+    
+    def test_concurrent_saves_deduplicated(self):
+        """测试内容相同的并发保存只执行一次"""
+        config_data = {
+            "llm_configs": {"test_llm": {"model_name": "gpt-3.5-turbo"}},
+            "embedding_configs": {"OpenAI": {"model_name": "text-embedding-ada-002"}}
+        }
+        self.mock_model.save_config.return_value = True
+        
+        async def run_test():
+            return await asyncio.gather(
+                self.controller.save_configuration(config_data),
+                self.controller.save_configuration(config_data)
+            )
+        
+        self.assertEqual(asyncio.run(run_test()), [True, True])
+        self.assertEqual(self.mock_model.save_config.call_count, 1)
+    
+    def test_dedupe_ignores_task_from_other_loop(self):
+        """测试其他事件循环遗留的进行中任务不会被当前循环复用"""
+        config_data = {
+            "llm_configs": {"test_llm": {"model_name": "gpt-3.5-turbo"}},
+            "embedding_configs": {"OpenAI": {"model_name": "text-embedding-ada-002"}}
+        }
+        self.mock_model.save_config.return_value = True
+        
+        stale_loop = asyncio.new_event_loop()
+        stale_task = stale_loop.create_future()
+        stale_loop.close()
+        self.controller._inflight[("save", _config_fingerprint(config_data))] = stale_task
+        
+        self.assertTrue(asyncio.run(self.controller.save_configuration(config_data)))
+        self.assertEqual(self.mock_model.save_config.call_count, 1)
+        self.assertEqual(self.controller._inflight, {})
+    
     def test_remove_llm_config(self):
         """测试移除LLM配置"""
         # 设置现有配置
@@ -329,6 +581,135 @@ class TestNovelController(unittest.TestCase):
         
         asyncio.run(run_test())
     
+    def test_project_config_cache(self):
+        """测试项目配置文件未变化时复用解析结果，修改后重新读取"""
+        config_path = os.path.join(self.temp_dir, "project_config.json")
+        self.assertTrue(self.controller._save_project_config(config_path, {"project_name": "测试项目"}))
+        
+        with patch("ui.controllers.novel_controller._json_loads_bytes") as mock_loads:
+            config = self.controller._load_project_config(config_path)
+            self.assertEqual(config["project_name"], "测试项目")
+            mock_loads.assert_not_called()
+            
+            # 返回副本，调用方修改不影响缓存
+            config["project_name"] = "已修改"
+            self.assertEqual(self.controller._load_project_config(config_path)["project_name"], "测试项目")
+        
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump({"project_name": "外部修改的项目"}, f, ensure_ascii=False)
+        self.assertEqual(self.controller._load_project_config(config_path)["project_name"], "外部修改的项目")
+
+    def test_project_config_cache_evicts_least_recently_used(self):
+        """测试项目配置缓存超出上限时淘汰最久未使用的条目"""
+        with patch("ui.controllers.novel_controller._PROJECT_CONFIG_CACHE_SIZE", 2):
+            paths = [os.path.join(self.temp_dir, f"project_{i}.json") for i in range(3)]
+            self.controller._save_project_config(paths[0], {"project_name": "项目0"})
+            self.controller._save_project_config(paths[1], {"project_name": "项目1"})
+            # 命中后项目0变为最近使用，新增项目2时淘汰项目1
+            self.controller._load_project_config(paths[0])
+            self.controller._save_project_config(paths[2], {"project_name": "项目2"})
+    
+        self.assertEqual(list(self.controller._project_config_cache), [paths[0], paths[2]])
+    
+    def test_project_files_listing_cached(self):
+        """测试目录未变化时复用文件列表，目录内新增文件后重新扫描"""
+        project_path = os.path.join(self.temp_dir, "test_project")
+        os.makedirs(os.path.join(project_path, "chapters"))
+        for name in ("Novel_architecture.txt", os.path.join("chapters", "chapter_1.txt")):
+            with open(os.path.join(project_path, name), 'w', encoding='utf-8') as f:
+                f.write("内容")
+        # 目录修改时间设为过去，避开刚修改目录不缓存的时间窗口
+        past = time.time() - 60
+        for directory in (project_path, os.path.join(project_path, "chapters")):
+            os.utime(directory, (past, past))
+        self.controller._current_project = {"path": project_path, "config": {}}
+        
+        expected = sorted(["Novel_architecture.txt", os.path.join("chapters", "chapter_1.txt")])
+        self.assertEqual(sorted(self.controller.get_project_files()), expected)
+        with patch("ui.controllers.novel_controller._scan_directory") as mock_scan:
+            self.assertEqual(sorted(self.controller.get_project_files()), expected)
+            mock_scan.assert_not_called()
+        
+        with open(os.path.join(project_path, "chapters", "chapter_2.txt"), 'w', encoding='utf-8') as f:
+            f.write("内容")
+        self.assertIn(os.path.join("chapters", "chapter_2.txt"), self.controller.get_project_files())
+    
+    def test_project_history_most_recent_first(self):
+        """测试项目历史按最近打开排序、去重并限制数量"""
+        for i in range(12):
+            self.controller._add_to_project_history(f"/projects/{i}", f"项目{i}")
+        self.controller._add_to_project_history("/projects/5", "项目5")
+        
+        history = self.controller.get_project_history()
+        self.assertEqual(len(history), 10)
+        self.assertEqual([item["path"] for item in history[:3]], ["/projects/5", "/projects/11", "/projects/10"])
+        self.assertNotIn("/projects/0", [item["path"] for item in history])
+        
+        # 历史为只读快照，未变化时重复获取返回同一对象
+        with self.assertRaises(TypeError):
+            history[0]["name"] = "修改"
+        self.assertIs(history, self.controller.get_project_history())
+    
+    def test_update_project_config_saves_coalesced(self):
+        """测试短时间内多次更新项目配置只写盘一次，调用所在的事件循环关闭后仍会保存"""
+        self.controller._current_project = {
+            "path": self.temp_dir,
+            "config": {"project_name": "测试项目"}
+        }
+        
+        async def run_test():
+            for i in range(3):
+                self.assertTrue(self.controller.update_project_config({"num_chapters": i}))
+            return self.controller._pending_save
+        
+        with patch("ui.controllers.novel_controller._AUTO_SAVE_DEBOUNCE_DELAY", 0.01), \
+             patch.object(self.controller, "_save_project_config", return_value=True) as mock_save:
+            timer = asyncio.run(run_test())
+            timer.join(1)
+        
+        self.assertEqual(mock_save.call_count, 1)
+        self.assertEqual(mock_save.call_args[0][1]["num_chapters"], 2)
+        self.assertFalse(self.controller._project_dirty)
+        self.assertIsNone(self.controller._pending_save)
+        # 自动保存不弹出保存成功提示
+        self.mock_view.show_success.assert_not_called()
+    
+    def test_auto_save_retries_after_failure(self):
+        """测试自动保存写盘失败后恢复修改标记并安排重试"""
+        self.controller._current_project = {
+            "path": self.temp_dir,
+            "config": {"project_name": "测试项目"}
+        }
+    
+        with patch("ui.controllers.novel_controller._AUTO_SAVE_DEBOUNCE_DELAY", 0.01), \
+             patch.object(self.controller, "_save_project_config", side_effect=[False, True]) as mock_save:
+            self.assertTrue(self.controller.update_project_config({"num_chapters": 3}))
+            timer = self.controller._pending_save
+            self.assertTrue(timer.daemon)
+            timer.join(1)
+            retry = self.controller._pending_save
+            self.assertIsNotNone(retry)
+            retry.join(1)
+    
+        self.assertEqual(mock_save.call_count, 2)
+        self.assertFalse(self.controller._project_dirty)
+        self.assertIsNone(self.controller._pending_save)
+    
+    def test_cleanup_saves_pending_changes(self):
+        """测试清理时取消自动保存并立即保存未写盘的修改"""
+        self.controller._current_project = {
+            "path": self.temp_dir,
+            "config": {"project_name": "测试项目"}
+        }
+        self.assertTrue(self.controller.update_project_config({"num_chapters": 5}))
+        
+        with patch.object(self.controller, "_save_project_history"):
+            asyncio.run(self.controller.cleanup())
+        
+        self.assertIsNone(self.controller._pending_save)
+        with open(os.path.join(self.temp_dir, "project_config.json"), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["num_chapters"], 5)
+    
     def test_project_validation(self):
         """测试项目数据验证"""
         # 有效项目数据
@@ -420,7 +801,7 @@ class TestGenerationController(unittest.TestCase):
             "word_number": 100000,
             "filepath": "/path/to/project"
         }
-        self.assertTrue(self.controller._validate_architecture_params(valid_params))
+        self.assertTrue(self.controller._validate_params("architecture", valid_params))
         
         # 无效参数 - 缺少必要字段
         invalid_params = {
@@ -428,7 +809,7 @@ class TestGenerationController(unittest.TestCase):
             "genre": "科幻"
             # 缺少其他必要字段
         }
-        self.assertFalse(self.controller._validate_architecture_params(invalid_params))
+        self.assertFalse(self.controller._validate_params("architecture", invalid_params))
     
     def test_validate_blueprint_params(self):
         """测试蓝图生成参数验证"""
@@ -437,14 +818,245 @@ class TestGenerationController(unittest.TestCase):
             "chapter_num": 1,
             "filepath": "/path/to/project"
         }
-        self.assertTrue(self.controller._validate_blueprint_params(valid_params))
+        self.assertTrue(self.controller._validate_params("blueprint", valid_params))
         
         # 无效参数
         invalid_params = {
             "chapter_num": 1
             # 缺少filepath
         }
-        self.assertFalse(self.controller._validate_blueprint_params(invalid_params))
+        self.assertFalse(self.controller._validate_params("blueprint", invalid_params))
+    
+    def test_generation_cache(self):
+        """测试相同参数的生成命中缓存，输出缺失或强制重新生成时不使用缓存"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        architecture_file = os.path.join(temp_dir, "Novel_architecture.txt")
+        params = {
+            "topic": "科幻小说",
+            "genre": "科幻",
+            "num_chapters": 10,
+            "word_number": 100000,
+            "filepath": temp_dir
+        }
+        
+        def fake_generate(**kwargs):
+            with open(architecture_file, "w", encoding="utf-8") as f:
+                f.write("架构")
+            return "ok"
+        
+        self.controller.set_generation_cache(GenerationCache())
+        
+        with patch.object(self.controller, "_get_llm_config_for_task", return_value=self.mock_llm_config), \
+             patch("novel_generator.architecture.Novel_architecture_generate", side_effect=fake_generate) as mock_generate:
+            self.assertTrue(asyncio.run(self.controller.generate_novel_architecture(params)))
+            self.assertTrue(asyncio.run(self.controller.generate_novel_architecture(dict(params))))
+            self.assertEqual(mock_generate.call_count, 1)
+            
+            # 强制重新生成
+            self.assertTrue(asyncio.run(self.controller.generate_novel_architecture(dict(params, force_regenerate=True))))
+            self.assertEqual(mock_generate.call_count, 2)
+            
+            # 输出文件被删除后重新生成
+            os.remove(architecture_file)
+            self.assertTrue(asyncio.run(self.controller.generate_novel_architecture(dict(params))))
+            self.assertEqual(mock_generate.call_count, 3)
+            
+            # 参数变化后重新生成
+            self.assertTrue(asyncio.run(self.controller.generate_novel_architecture(dict(params, topic="奇幻小说"))))
+            self.assertEqual(mock_generate.call_count, 4)
+    
+    def test_llm_config_cache_invalidated_on_change(self):
+        """测试任务LLM配置被缓存，配置控制器发出变化事件后重新获取"""
+        config_controller = ConfigController()
+        config_controller._config_cache = {
+            "llm_configs": {"test_config": self.mock_llm_config},
+            "embedding_configs": {}
+        }
+        config_controller.set_current_llm_config("test_config")
+        self.controller.config_controller = config_controller
+        
+        with patch.object(config_controller, "get_current_llm_config",
+                          wraps=config_controller.get_current_llm_config) as mock_get:
+            self.controller._get_llm_config_for_task("draft")
+            self.controller._get_llm_config_for_task("draft")
+            self.assertEqual(mock_get.call_count, 1)
+            
+            config_controller.update_llm_config("test_config", dict(self.mock_llm_config, temperature=0.3))
+            self.controller._get_llm_config_for_task("draft")
+            self.assertEqual(mock_get.call_count, 2)
+    
+    def test_generation_cache_persisted(self):
+        """测试生成缓存写入文件后可被新实例读取，易变参数不影响缓存键"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        cache_file = os.path.join(temp_dir, "generation_cache.json")
+        
+        key = GenerationCache.make_key("draft", self.mock_llm_config, {"chapter_num": 1, "timestamp": 1})
+        self.assertEqual(
+            key, GenerationCache.make_key("draft", self.mock_llm_config, {"chapter_num": 1, "timestamp": 2})
+        )
+        # 预先计算的配置指纹与现场计算结果一致
+        fingerprint = GenerationCache.llm_fingerprint(self.mock_llm_config)
+        self.assertEqual(
+            key, GenerationCache.make_key("draft", self.mock_llm_config, {"chapter_num": 1}, fingerprint)
+        )
+        GenerationCache(persist_path=cache_file).update(key)
+        self.assertTrue(GenerationCache(persist_path=cache_file).get(key))
+        
+        # 温度变化后视为不同的生成
+        self.assertNotEqual(
+            key, GenerationCache.make_key("draft", dict(self.mock_llm_config, temperature=0.2), {"chapter_num": 1})
+        )
+    
+    def test_generate_chapter_drafts_batch(self):
+        """测试批量生成时不同项目并发、同一项目按章节顺序执行，结果与参数一一对应"""
+        running = []
+        peak = []
+        order = []
+        
+        async def fake_run_llm(func, llm_config, params):
+            running.append(params["filepath"])
+            peak.append(len(running))
+            order.append((params["filepath"], params["chapter_num"]))
+            await asyncio.sleep(0.01)
+            running.remove(params["filepath"])
+            return (params["filepath"], params["chapter_num"]) != ("/path/to/b", 1)
+        
+        params_list = [
+            {"filepath": "/path/to/a", "chapter_num": 2},
+            {"filepath": "/path/to/b", "chapter_num": 1},
+            {"filepath": "/path/to/a", "chapter_num": 1},
+            {"filepath": "/path/to/b", "chapter_num": 2},
+        ]
+        progress = []
+        self.controller.add_event_listener(
+            "draft_generation_progress", lambda event: progress.append(event.data["progress"])
+        )
+        
+        with patch.object(self.controller, "_get_llm_config_for_task", return_value=self.mock_llm_config), \
+             patch.object(self.controller, "_run_llm", fake_run_llm):
+            results = asyncio.run(
+                self.controller.generate_chapter_drafts_batch(params_list, max_concurrency=2)
+            )
+        
+        # b项目第1章失败后第2章不再生成
+        self.assertEqual(results, [True, False, True, False])
+        self.assertNotIn(("/path/to/b", 2), order)
+        self.assertLess(order.index(("/path/to/a", 1)), order.index(("/path/to/a", 2)))
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(progress, [0.25, 0.5, 0.75, 1.0])
+        self.assertEqual(self.controller.state, ControllerState.ERROR)
+    
+    def test_generate_chapter_drafts_batch_uses_cache(self):
+        """测试批量生成与单章生成共用生成缓存，输入文件变化后重新生成"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        os.makedirs(os.path.join(temp_dir, "chapters"))
+        directory_file = os.path.join(temp_dir, "Novel_directory.txt")
+        with open(directory_file, "w", encoding="utf-8") as f:
+            f.write("目录")
+        calls = []
+        
+        async def fake_run_llm(func, llm_config, params):
+            calls.append(params["chapter_num"])
+            with open(os.path.join(temp_dir, "chapters", "chapter_1.txt"), "w", encoding="utf-8") as f:
+                f.write("草稿")
+            return True
+        
+        self.controller.set_generation_cache(GenerationCache())
+        params_list = [{"filepath": temp_dir, "chapter_num": 1}]
+        with patch.object(self.controller, "_get_llm_config_for_task", return_value=self.mock_llm_config), \
+             patch.object(self.controller, "_run_llm", fake_run_llm):
+            self.assertEqual(asyncio.run(self.controller.generate_chapter_drafts_batch(params_list)), [True])
+            self.assertTrue(asyncio.run(self.controller.generate_chapter_draft(dict(params_list[0]))))
+            self.assertEqual(calls, [1])
+            
+            with open(directory_file, "w", encoding="utf-8") as f:
+                f.write("修改后的目录")
+            self.assertTrue(asyncio.run(self.controller.generate_chapter_draft(dict(params_list[0]))))
+            self.assertEqual(calls, [1, 1])
+    
+    def test_cancel_current_task_cancels_llm_call(self):
+        """测试取消当前任务时正在等待的LLM调用被取消"""
+        async def fake_run_llm(func, llm_config, params):
+            await asyncio.sleep(10)
+            return True
+        
+        async def run_test():
+            task = asyncio.ensure_future(
+                self.controller.generate_chapter_draft({"filepath": "/path/to/project", "chapter_num": 1})
+            )
+            await asyncio.sleep(0.01)
+            self.controller.cancel_current_task()
+            return await asyncio.wait_for(task, 1)
+        
+        with patch.object(self.controller, "_get_llm_config_for_task", return_value=self.mock_llm_config), \
+             patch.object(self.controller, "_run_llm", fake_run_llm):
+            self.assertFalse(asyncio.run(run_test()))
+        self.assertIsNone(self.controller.get_current_task())
+        self.assertEqual(self.controller.state, ControllerState.IDLE)
+    
+    def test_finalization_skipped_when_inputs_unchanged(self):
+        """测试启用生成缓存后章节内容未变化时跳过重复定稿"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        os.makedirs(os.path.join(temp_dir, "chapters"))
+        chapter_file = os.path.join(temp_dir, "chapters", "chapter_1.txt")
+        summary_file = os.path.join(temp_dir, "global_summary.txt")
+        with open(chapter_file, "w", encoding="utf-8") as f:
+            f.write("第一章内容")
+        with open(summary_file, "w", encoding="utf-8") as f:
+            f.write("摘要")
+        params = {"filepath": temp_dir, "chapter_num": 1}
+        self.controller.set_generation_cache(GenerationCache())
+        
+        with patch.object(self.controller, "_get_llm_config_for_task", return_value=self.mock_llm_config), \
+             patch("novel_generator.finalization.finalize_chapter", return_value="ok") as mock_finalize:
+            self.assertTrue(asyncio.run(self.controller.finalize_chapter(params)))
+            self.assertTrue(asyncio.run(self.controller.finalize_chapter(dict(params))))
+            self.assertEqual(mock_finalize.call_count, 1)
+            
+            # 全局摘要被其他章节更新后仍然跳过，避免重复累加摘要
+            with open(summary_file, "a", encoding="utf-8") as f:
+                f.write("第二章摘要")
+            self.assertTrue(asyncio.run(self.controller.finalize_chapter(dict(params))))
+            self.assertEqual(mock_finalize.call_count, 1)
+            
+            # 章节内容修改后重新定稿
+            with open(chapter_file, "w", encoding="utf-8") as f:
+                f.write("修改后的第一章内容")
+            self.assertTrue(asyncio.run(self.controller.finalize_chapter(dict(params))))
+            self.assertEqual(mock_finalize.call_count, 2)
+    
+    def test_blueprint_regenerated_when_output_modified(self):
+        """测试启用生成缓存后蓝图输出被修改或强制重新生成时不跳过"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        with open(os.path.join(temp_dir, "Novel_architecture.txt"), "w", encoding="utf-8") as f:
+            f.write("架构")
+        directory_file = os.path.join(temp_dir, "Novel_directory.txt")
+        
+        def fake_blueprint(filepath, llm_config):
+            with open(directory_file, "w", encoding="utf-8") as f:
+                f.write("目录")
+            return "ok"
+        
+        params = {"filepath": temp_dir}
+        self.controller.set_generation_cache(GenerationCache())
+        with patch.object(self.controller, "_get_llm_config_for_task", return_value=self.mock_llm_config), \
+             patch("novel_generator.blueprint.Chapter_blueprint_generate", side_effect=fake_blueprint) as mock_generate:
+            self.assertTrue(asyncio.run(self.controller.generate_chapter_blueprint(params)))
+            self.assertTrue(asyncio.run(self.controller.generate_chapter_blueprint(dict(params))))
+            self.assertEqual(mock_generate.call_count, 1)
+            
+            with open(directory_file, "w", encoding="utf-8") as f:
+                f.write("手动修改的目录")
+            self.assertTrue(asyncio.run(self.controller.generate_chapter_blueprint(dict(params))))
+            self.assertEqual(mock_generate.call_count, 2)
+            
+            self.assertTrue(asyncio.run(self.controller.generate_chapter_blueprint(dict(params, force_regenerate=True))))
+            self.assertEqual(mock_generate.call_count, 3)
     
     def test_generation_callbacks(self):
         """测试生成回调系统"""
@@ -3,13 +3,38 @@
 负责所有配置相关的数据管理和状态维护
 """
 import os
+import sys
 import logging
+from contextlib import contextmanager
+from operator import attrgetter
 from typing import Dict, Any, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from .mvp_base import BaseModel
 
+# 数据类使用slots减少内存并加速属性访问（Python 3.10+），控制器中的数据类共用此选项
+DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _fast_json_load(config_file: str) -> dict:
+    """读取配置文件，orjson可用时直接解析原始字节"""
+    if ORJSON_AVAILABLE and os.path.exists(config_file):
+        try:
+            with open(config_file, 'rb') as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+    
+    from config_manager import load_config
+    return load_config(config_file)
+
+
+@dataclass(**DATACLASS_OPTIONS)
 class LLMConfig:
     """LLM配置数据类"""
     api_key: str = ""
@@ -24,7 +49,7 @@ class LLMConfig:
     created_at: Optional[str] = None  # 添加created_at字段以兼容配置文件
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class EmbeddingConfig:
     """Embedding配置数据类"""
     api_key: str = ""
@@ -36,7 +61,7 @@ class EmbeddingConfig:
     created_at: Optional[str] = None  # 添加created_at字段以兼容配置文件
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class NovelParams:
     """小说参数数据类"""
     topic: str = ""
@@ -55,7 +80,7 @@ class NovelParams:
     webdav_password: str = ""
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class ProxySettings:
     """代理设置数据类"""
     enabled: bool = False
@@ -63,7 +88,7 @@ class ProxySettings:
     proxy_port: str = ""
 
 
-@dataclass
+@dataclass(**DATACLASS_OPTIONS)
 class ChooseConfigs:
     """选择配置数据类"""
     architecture_llm: str = "DeepSeek"
@@ -73,6 +98,37 @@ class ChooseConfigs:
     prompt_draft_llm: str = "DeepSeek"
 
 
+_FIELD_NAMES_CACHE: Dict[type, frozenset] = {}
+
+
+def _from_dict(cls, data: Dict[str, Any]):
+    """
+    从字典构建数据类实例
+    只读取数据类声明的字段，未知键直接跳过，缺失键使用默认值
+    """
+    names = _FIELD_NAMES_CACHE.get(cls)
+    if names is None:
+        names = _FIELD_NAMES_CACHE[cls] = frozenset(f.name for f in fields(cls))
+    return cls(**{key: value for key, value in data.items() if key in names})
+
+
+def _field_dumper(*names: str):
+    """预编译字段序列化函数：一次attrgetter调用取出全部字段值"""
+    getter = attrgetter(*names)
+    return lambda obj: dict(zip(names, getter(obj)))
+
+
+# 写入配置文件的字段（顺序即文件中的键顺序）
+_dump_llm_config = _field_dumper(
+    "api_key", "base_url", "model_name", "temperature",
+    "max_tokens", "timeout", "interface_format"
+)
+_dump_embedding_config = _field_dumper("api_key", "base_url", "model_name", "retrieval_k")
+_dump_novel_params = _field_dumper(*(f.name for f in fields(NovelParams)))
+_dump_proxy_settings = _field_dumper(*(f.name for f in fields(ProxySettings)))
+_dump_choose_configs = _field_dumper(*(f.name for f in fields(ChooseConfigs)))
+
+
 class ConfigurationManager(BaseModel):
     """
     配置管理器
@@ -89,16 +145,56 @@ class ConfigurationManager(BaseModel):
         self._choose_configs = ChooseConfigs()
         self._current_llm_config = ""
         self._current_embedding_interface = "OpenAI"
+        # 当前配置对象缓存，名称或配置变更时失效
+        self._current_llm_obj: Optional[LLMConfig] = None
+        self._current_embedding_obj: Optional[EmbeddingConfig] = None
+        # 未选择配置时返回的默认实例，首次需要时创建；只在本管理器内共享，
+        # 数据类可变，不使用模块级共享实例，避免调用方修改后影响其他管理器
+        self._default_llm_obj: Optional[LLMConfig] = None
+        self._default_embedding_obj: Optional[EmbeddingConfig] = None
+        # 批量更新期间暂存的通知：事件名 -> 最新数据
+        self._batch_depth = 0
+        self._pending_notifications: Dict[str, Any] = {}
+        # 上次写入环境变量的代理地址，未变化时跳过环境变量修改
+        self._last_proxy: Optional[str] = None
         
         # 加载配置
         self.load_configuration()
     
+    @contextmanager
+    def batch_updates(self):
+        """
+        批量更新上下文
+        期间的通知按事件名合并，退出时每个事件只通知一次（携带最新数据）
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending_notifications:
+                pending = self._pending_notifications
+                self._pending_notifications = {}
+                for event, data in pending.items():
+                    super().notify_observers(event, data)
+    
+    def notify_observers(self, event: str, data: Any = None):
+        """通知所有观察者，批量更新期间延迟合并"""
+        if self._batch_depth:
+            self._pending_notifications.pop(event, None)
+            self._pending_notifications[event] = data
+            return
+        super().notify_observers(event, data)
+    
     def load_configuration(self) -> bool:
         """加载配置文件"""
-        from config_manager import load_config
-        
+        with self.batch_updates():
+            return self._load_configuration()
+    
+    def _load_configuration(self) -> bool:
+        """解析配置文件并填充各配置项"""
         try:
-            loaded_config = load_config(self.config_file)
+            loaded_config = _fast_json_load(self.config_file)
             if not loaded_config:
                 self._initialize_default_config()
                 self.notify_observers("config_loaded", self._get_current_config())
@@ -107,7 +203,7 @@ class ConfigurationManager(BaseModel):
             # 解析LLM配置
             if "llm_configs" in loaded_config:
                 for name, config in loaded_config["llm_configs"].items():
-                    self._llm_configs[name] = LLMConfig(**config)
+                    self._llm_configs[name] = _from_dict(LLMConfig, config)
                 
                 # 设置当前LLM配置
                 if self._llm_configs:
@@ -116,48 +212,20 @@ class ConfigurationManager(BaseModel):
             # 解析Embedding配置
             if "embedding_configs" in loaded_config:
                 for interface, config in loaded_config["embedding_configs"].items():
-                    self._embedding_configs[interface] = EmbeddingConfig(**config)
+                    self._embedding_configs[interface] = _from_dict(EmbeddingConfig, config)
             
             # 解析小说参数
             if "other_params" in loaded_config:
-                params = loaded_config["other_params"]
-                self._novel_params = NovelParams(
-                    topic=params.get("topic", ""),
-                    genre=params.get("genre", "玄幻"),
-                    num_chapters=params.get("num_chapters", 10),
-                    word_number=params.get("word_number", 3000),
-                    filepath=params.get("filepath", ""),
-                    chapter_num=params.get("chapter_num", 1),
-                    characters_involved=params.get("characters_involved", ""),
-                    key_items=params.get("key_items", ""),
-                    scene_location=params.get("scene_location", ""),
-                    time_constraint=params.get("time_constraint", ""),
-                    user_guidance=params.get("user_guidance", ""),
-                    webdav_url=params.get("webdav_url", ""),
-                    webdav_username=params.get("webdav_username", ""),
-                    webdav_password=params.get("webdav_password", "")
-                )
+                self._novel_params = _from_dict(NovelParams, loaded_config["other_params"])
             
             # 解析代理设置
             if "proxy_setting" in loaded_config:
-                proxy = loaded_config["proxy_setting"]
-                self._proxy_settings = ProxySettings(
-                    enabled=proxy.get("enabled", False),
-                    proxy_url=proxy.get("proxy_url", ""),
-                    proxy_port=proxy.get("proxy_port", "")
-                )
+                self._proxy_settings = _from_dict(ProxySettings, loaded_config["proxy_setting"])
                 self._apply_proxy_settings()
             
             # 解析选择配置
             if "choose_configs" in loaded_config:
-                choose = loaded_config["choose_configs"]
-                self._choose_configs = ChooseConfigs(
-                    architecture_llm=choose.get("architecture_llm", "DeepSeek"),
-                    chapter_outline_llm=choose.get("chapter_outline_llm", "DeepSeek"),
-                    final_chapter_llm=choose.get("final_chapter_llm", "DeepSeek"),
-                    consistency_review_llm=choose.get("consistency_review_llm", "DeepSeek"),
-                    prompt_draft_llm=choose.get("prompt_draft_llm", "DeepSeek")
-                )
+                self._choose_configs = _from_dict(ChooseConfigs, loaded_config["choose_configs"])
             
             # 获取当前Embedding接口
             self._current_embedding_interface = loaded_config.get("last_embedding_interface_format", "OpenAI")
@@ -166,6 +234,7 @@ class ConfigurationManager(BaseModel):
             if "last_llm_config_name" in loaded_config and loaded_config["last_llm_config_name"] in self._llm_configs:
                 self._current_llm_config = loaded_config["last_llm_config_name"]
             
+            self._invalidate_current_configs()
             self.notify_observers("config_loaded", self._get_current_config())
             return True
             
@@ -205,61 +274,29 @@ class ConfigurationManager(BaseModel):
         # 默认Embedding配置
         self._embedding_configs["OpenAI"] = EmbeddingConfig()
         self._current_embedding_interface = "OpenAI"
+        self._invalidate_current_configs()
         
         # 其他默认值已在dataclass中定义
     
+    def _invalidate_current_configs(self):
+        """使当前配置对象缓存失效"""
+        self._current_llm_obj = None
+        self._current_embedding_obj = None
+    
     def _get_current_config(self) -> Dict[str, Any]:
         """获取当前完整配置"""
         return {
             "llm_configs": {
-                name: {
-                    "api_key": config.api_key,
-                    "base_url": config.base_url,
-                    "model_name": config.model_name,
-                    "temperature": config.temperature,
-                    "max_tokens": config.max_tokens,
-                    "timeout": config.timeout,
-                    "interface_format": config.interface_format
-                }
+                name: _dump_llm_config(config)
                 for name, config in self._llm_configs.items()
             },
             "embedding_configs": {
-                interface: {
-                    "api_key": config.api_key,
-                    "base_url": config.base_url,
-                    "model_name": config.model_name,
-                    "retrieval_k": config.retrieval_k
-                }
+                interface: _dump_embedding_config(config)
                 for interface, config in self._embedding_configs.items()
             },
-            "other_params": {
-                "topic": self._novel_params.topic,
-                "genre": self._novel_params.genre,
-                "num_chapters": self._novel_params.num_chapters,
-                "word_number": self._novel_params.word_number,
-                "filepath": self._novel_params.filepath,
-                "chapter_num": self._novel_params.chapter_num,
-                "characters_involved": self._novel_params.characters_involved,
-                "key_items": self._novel_params.key_items,
-                "scene_location": self._novel_params.scene_location,
-                "time_constraint": self._novel_params.time_constraint,
-                "user_guidance": self._novel_params.user_guidance,
-                "webdav_url": self._novel_params.webdav_url,
-                "webdav_username": self._novel_params.webdav_username,
-                "webdav_password": self._novel_params.webdav_password
-            },
-            "proxy_setting": {
-                "enabled": self._proxy_settings.enabled,
-                "proxy_url": self._proxy_settings.proxy_url,
-                "proxy_port": self._proxy_settings.proxy_port
-            },
-            "choose_configs": {
-                "architecture_llm": self._choose_configs.architecture_llm,
-                "chapter_outline_llm": self._choose_configs.chapter_outline_llm,
-                "final_chapter_llm": self._choose_configs.final_chapter_llm,
-                "consistency_review_llm": self._choose_configs.consistency_review_llm,
-                "prompt_draft_llm": self._choose_configs.prompt_draft_llm
-            },
+            "other_params": _dump_novel_params(self._novel_params),
+            "proxy_setting": _dump_proxy_settings(self._proxy_settings),
+            "choose_configs": _dump_choose_configs(self._choose_configs),
             "last_embedding_interface_format": self._current_embedding_interface,
             "last_llm_config_name": self._current_llm_config
         }
@@ -268,26 +305,44 @@ class ConfigurationManager(BaseModel):
         """应用代理设置"""
         if self._proxy_settings.enabled:
             proxy_url = f"http://{self._proxy_settings.proxy_url}:{self._proxy_settings.proxy_port}"
+        else:
+            proxy_url = None
+        
+        if proxy_url == self._last_proxy and os.environ.get('HTTP_PROXY') == proxy_url:
+            return
+        
+        if proxy_url:
             os.environ['HTTP_PROXY'] = proxy_url
             os.environ['HTTPS_PROXY'] = proxy_url
         else:
             os.environ.pop('HTTP_PROXY', None)
             os.environ.pop('HTTPS_PROXY', None)
+        self._last_proxy = proxy_url
     
     # 属性访问器
     @property
     def current_llm_config(self) -> LLMConfig:
         """获取当前LLM配置"""
+        if self._current_llm_obj is not None:
+            return self._current_llm_obj
         if self._current_llm_config in self._llm_configs:
-            return self._llm_configs[self._current_llm_config]
-        return LLMConfig()
+            self._current_llm_obj = self._llm_configs[self._current_llm_config]
+            return self._current_llm_obj
+        if self._default_llm_obj is None:
+            self._default_llm_obj = LLMConfig()
+        return self._default_llm_obj
     
     @property
     def current_embedding_config(self) -> EmbeddingConfig:
         """获取当前Embedding配置"""
+        if self._current_embedding_obj is not None:
+            return self._current_embedding_obj
         if self._current_embedding_interface in self._embedding_configs:
-            return self._embedding_configs[self._current_embedding_interface]
-        return EmbeddingConfig()
+            self._current_embedding_obj = self._embedding_configs[self._current_embedding_interface]
+            return self._current_embedding_obj
+        if self._default_embedding_obj is None:
+            self._default_embedding_obj = EmbeddingConfig()
+        return self._default_embedding_obj
     
     @property
     def novel_params(self) -> NovelParams:
@@ -321,11 +376,15 @@ class ConfigurationManager(BaseModel):
         # 如果是新配置或者当前没有选择配置，设置为当前配置
         if not self._current_llm_config or config_name not in self._llm_configs:
             self._current_llm_config = config_name
+        if config_name == self._current_llm_config:
+            self._current_llm_obj = config
         self.notify_observers("llm_config_updated", {"name": config_name, "config": config})
     
     def update_embedding_config(self, interface: str, config: EmbeddingConfig):
         """更新Embedding配置"""
         self._embedding_configs[interface] = config
+        if interface == self._current_embedding_interface:
+            self._current_embedding_obj = config
         self.notify_observers("embedding_config_updated", {"interface": interface, "config": config})
     
     def update_novel_params(self, params: NovelParams):
@@ -348,10 +407,12 @@ class ConfigurationManager(BaseModel):
         """设置当前LLM配置"""
         if config_name in self._llm_configs:
             self._current_llm_config = config_name
+            self._current_llm_obj = self._llm_configs[config_name]
             self.notify_observers("current_llm_config_changed", config_name)
     
     def set_current_embedding_interface(self, interface: str):
         """设置当前Embedding接口"""
         if interface in self._embedding_configs:
             self._current_embedding_interface = interface
+            self._current_embedding_obj = self._embedding_configs[interface]
             self.notify_observers("current_embedding_interface_changed", interface)
\ No newline at end of file
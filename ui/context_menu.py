@@ -17,15 +17,20 @@ class TextWidgetContextMenu:
         self.menu.add_separator()
         self.menu.add_command(label=t("context_menu.select_all"), command=self.select_all)
         
+        # 预先绑定弹出/释放方法，避免每次右键重复解析属性
+        self._popup = self.menu.tk_popup
+        self._release = self.menu.grab_release
+        self._is_textbox = isinstance(self.widget, ctk.CTkTextbox)
+        
         # 绑定右键事件
         self.widget.bind("<Button-3>", self.show_menu)
         
     def show_menu(self, event):
-        if isinstance(self.widget, ctk.CTkTextbox):
+        if self._is_textbox:
             try:
-                self.menu.tk_popup(event.x_root, event.y_root)
+                self._popup(event.x_root, event.y_root)
             finally:
-                self.menu.grab_release()
+                self._release()
             
     def copy(self):
         try:
@@ -3,11 +3,20 @@
 定义MVP架构中Presenter层的基础接口和通用功能
 """
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, Callable, List
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Callable, List, Mapping, Set
 import logging
 import asyncio
+import atexit
+import inspect
+import functools
+import threading
+from concurrent.futures import Executor
+from contextlib import contextmanager
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from time import time as _now
+from ..config_models import DATACLASS_OPTIONS
 
 
 class ControllerState(Enum):
@@ -18,18 +27,26 @@ class ControllerState(Enum):
     COMPLETED = "completed"
 
 
-@dataclass
+# 批量分发按事件内容去重，需要事件可哈希，因此单独冻结
+@dataclass(frozen=True, **DATACLASS_OPTIONS)
 class ControllerEvent:
-    """控制器事件数据类"""
+    """控制器事件数据类（时间戳不参与比较，内容相同的事件视为相等）"""
     event_type: str
     source: str
     data: Any = None
-    timestamp: float = None
-    
-    def __post_init__(self):
-        if self.timestamp is None:
-            import time
-            self.timestamp = time.time()
+    timestamp: float = field(default_factory=_now, compare=False)
+
+
+async def run_blocking(func: Callable, *args, executor: Optional[Executor] = None, **kwargs):
+    """
+    在线程池中执行阻塞调用
+    直接使用run_in_executor，省去asyncio.to_thread复制上下文变量的开销；
+    仅在有关键字参数时才包装partial
+    """
+    loop = asyncio.get_running_loop()
+    if kwargs:
+        func = functools.partial(func, **kwargs)
+    return await loop.run_in_executor(executor, func, *args)
 
 
 class BaseController(ABC):
@@ -44,6 +61,9 @@ class BaseController(ABC):
         self.logger = logging.getLogger(f"Controller.{name}")
         self._event_handlers: Dict[str, List[Callable]] = {}
         self._error_handlers: List[Callable] = []
+        self._error_dispatch: Callable = self._build_error_dispatch()
+        # 批量事件缓冲区，None表示未处于批量模式
+        self._event_buffer: Optional[List[ControllerEvent]] = None
         self._model = None
         self._view = None
     
@@ -97,38 +117,103 @@ class BaseController(ABC):
             self._event_handlers[event_type] = []
         self._event_handlers[event_type].append(handler)
     
+    @contextmanager
+    def batch_events(self):
+        """
+        批量事件上下文
+        期间发出的事件先缓存，退出时统一分发；嵌套使用时由最外层负责分发
+        """
+        if self._event_buffer is not None:
+            yield self
+            return
+        
+        self._event_buffer = []
+        try:
+            yield self
+        finally:
+            buffered = self._event_buffer
+            self._event_buffer = None
+            # 合并批次内完全相同的事件（数据不可哈希的事件不合并）
+            seen = set()
+            for event in buffered:
+                try:
+                    if event in seen:
+                        continue
+                    seen.add(event)
+                except TypeError:
+                    pass
+                self._dispatch_event(event)
+    
     def emit_event(self, event: ControllerEvent):
         """发出事件"""
+        if self._event_buffer is not None:
+            self._event_buffer.append(event)
+            return
+        self._dispatch_event(event)
+    
+    def has_listeners(self, event_type: str) -> bool:
+        """是否有监听器订阅了该事件类型"""
+        return event_type in self._event_handlers
+    
+    def _emit(self, event_type: str, data: Any = None):
+        """以本控制器为来源构建并发出事件，无人监听且未处于批量模式时不创建事件"""
+        if self._event_buffer is None and event_type not in self._event_handlers:
+            return
+        self.emit_event(ControllerEvent(event_type, self.name, data))
+    
+    def _dispatch_event(self, event: ControllerEvent):
+        """将事件分发给已注册的监听器"""
         handlers = self._event_handlers.get(event.event_type, [])
         for handler in handlers:
             try:
                 handler(event)
             except Exception as e:
-                self.logger.error(f"Event handler failed: {e}")
+                self.logger.error("Event handler failed: %s", e)
                 self._handle_error(e, f"Event handler for {event.event_type}")
     
     def add_error_handler(self, handler: Callable):
         """添加错误处理器"""
         self._error_handlers.append(handler)
+        self._error_dispatch = self._build_error_dispatch()
+    
+    def remove_error_handler(self, handler: Callable):
+        """移除错误处理器"""
+        try:
+            self._error_handlers.remove(handler)
+        except ValueError:
+            return
+        self._error_dispatch = self._build_error_dispatch()
+    
+    def _build_error_dispatch(self) -> Callable:
+        """根据当前错误处理器列表预编译分发函数"""
+        handlers = tuple(self._error_handlers)
+        if not handlers:
+            return lambda error, context: None
+        
+        def dispatch(error: Exception, context: str):
+            for handler in handlers:
+                try:
+                    handler(error, context)
+                except Exception as e:
+                    self.logger.error("Error handler failed: %s", e)
+        
+        return dispatch
     
     def _handle_error(self, error: Exception, context: str = ""):
         """处理错误"""
         self.state = ControllerState.ERROR
-        self.logger.error(f"Error in {context}: {error}")
+        self.logger.error("Error in %s: %s", context, error)
         
         # 调用错误处理器
-        for handler in self._error_handlers:
-            try:
-                handler(error, context)
-            except Exception as e:
-                self.logger.error(f"Error handler failed: {e}")
+        self._error_dispatch(error, context)
         
-        # 通知View显示错误
-        if self._view and hasattr(self._view, 'show_error'):
+        # 通知View显示错误（单次getattr代替hasattr加二次属性查找）
+        show_error = getattr(self._view, 'show_error', None)
+        if show_error is not None:
             try:
-                self._view.show_error(f"{context}: {str(error)}")
+                show_error(f"{context}: {str(error)}")
             except Exception as e:
-                self.logger.error(f"Failed to show error in view: {e}")
+                self.logger.error("Failed to show error in view: %s", e)
     
     def set_state(self, state: ControllerState, data: Any = None):
         """设置控制器状态"""
@@ -136,16 +221,16 @@ class BaseController(ABC):
         self.state = state
         
         # 发出状态变化事件
-        event = ControllerEvent(
-            event_type="state_changed",
-            source=self.name,
-            data={
-                'old_state': old_state,
-                'new_state': state,
-                'data': data
-            }
-        )
-        self.emit_event(event)
+        self._emit("state_changed", {
+            'old_state': old_state,
+            'new_state': state,
+            'data': data
+        })
+    
+    def _set_state_transition(self, state: ControllerState, data: Any = None):
+        """切换到目标状态，已处于该状态时不重复通知（用于嵌套调用的入口与出口）"""
+        if self.state is not state:
+            self.set_state(state, data)
     
     @abstractmethod
     async def initialize(self) -> bool:
@@ -176,47 +261,67 @@ class ControllerRegistry:
     
     def __init__(self):
         self._controllers: Dict[str, BaseController] = {}
+        # 只读视图，随注册表实时更新，无需每次复制
+        self._controllers_view = MappingProxyType(self._controllers)
         self.logger = logging.getLogger("ControllerRegistry")
+        # 在事件循环中调度的清理任务，保持强引用直到完成，避免被垃圾回收
+        self._cleanup_tasks: Set[asyncio.Task] = set()
+        # 无运行中事件循环时同步清理使用的事件循环，首次需要时创建并复用，进程退出时关闭
+        self._cleanup_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cleanup_loop_lock = threading.Lock()
     
     def register(self, controller: BaseController):
         """注册控制器"""
         if controller.name in self._controllers:
-            self.logger.warning(f"Controller {controller.name} already registered, replacing")
+            self.logger.warning("Controller %s already registered, replacing", controller.name)
         
         self._controllers[controller.name] = controller
-        self.logger.info(f"Controller {controller.name} registered")
+        self.logger.info("Controller %s registered", controller.name)
     
     def unregister(self, name: str) -> bool:
         """注销控制器"""
         if name in self._controllers:
             controller = self._controllers[name]
-            # 同步清理，避免事件循环问题
             try:
-                import asyncio
-                if asyncio.iscoroutinefunction(controller.cleanup):
-                    # 如果在事件循环中，直接调用
-                    try:
-                        loop = asyncio.get_running_loop()
-                        asyncio.create_task(controller.cleanup())
-                    except RuntimeError:
-                        # 如果没有运行的事件循环，创建新的
-                        asyncio.run(controller.cleanup())
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    # 没有运行的事件循环，同步完成清理，保证注销返回时资源已释放
+                    self._run_cleanup_sync([controller])
                 else:
-                    controller.cleanup()
+                    # 在事件循环中，直接调度清理任务
+                    task = loop.create_task(self._cleanup_controllers([controller]))
+                    self._cleanup_tasks.add(task)
+                    task.add_done_callback(self._cleanup_tasks.discard)
             except Exception as e:
-                print(f"清理控制器时出错: {e}")
+                self.logger.error("清理控制器时出错: %s", e)
             
             del self._controllers[name]
             return True
         return False
     
+    def _run_cleanup_sync(self, controllers: List[BaseController]):
+        """在复用的事件循环中同步清理，避免每次注销都新建并关闭事件循环"""
+        with self._cleanup_loop_lock:
+            if self._cleanup_loop is None or self._cleanup_loop.is_closed():
+                self._cleanup_loop = asyncio.new_event_loop()
+                atexit.register(self._close_cleanup_loop)
+            self._cleanup_loop.run_until_complete(self._cleanup_controllers(controllers))
+    
+    def _close_cleanup_loop(self):
+        """关闭同步清理使用的事件循环"""
+        with self._cleanup_loop_lock:
+            if self._cleanup_loop is not None and not self._cleanup_loop.is_closed():
+                self._cleanup_loop.close()
+            self._cleanup_loop = None
+    
     def get(self, name: str) -> Optional[BaseController]:
         """获取控制器"""
         return self._controllers.get(name)
     
-    def get_all(self) -> Dict[str, BaseController]:
-        """获取所有控制器"""
-        return self._controllers.copy()
+    def get_all(self) -> Mapping[str, BaseController]:
+        """获取所有控制器（只读视图）"""
+        return self._controllers_view
     
     async def initialize_all(self) -> bool:
         """初始化所有控制器"""
@@ -224,21 +329,35 @@ class ControllerRegistry:
         for name, controller in self._controllers.items():
             try:
                 if not await controller.initialize():
-                    self.logger.error(f"Failed to initialize controller {name}")
+                    self.logger.error("Failed to initialize controller %s", name)
                     success = False
             except Exception as e:
-                self.logger.error(f"Exception during initialization of {name}: {e}")
+                self.logger.error("Exception during initialization of %s: %s", name, e)
                 success = False
         
         return success
     
     async def cleanup_all(self):
         """清理所有控制器"""
-        for name, controller in self._controllers.items():
+        await self._cleanup_controllers(list(self._controllers.values()))
+    
+    async def _cleanup_controllers(self, controllers: List[BaseController]):
+        """在同一事件循环中并发清理一组控制器，单个控制器出错不影响其余控制器"""
+        pending = []
+        for controller in controllers:
             try:
-                await controller.cleanup()
+                result = controller.cleanup()
             except Exception as e:
-                self.logger.error(f"Exception during cleanup of {name}: {e}")
+                self.logger.error("Exception during cleanup of %s: %s", controller.name, e)
+                continue
+            # 子类可能以同步方法覆盖cleanup，只等待可等待的返回值
+            if inspect.isawaitable(result):
+                pending.append((controller, result))
+        
+        results = await asyncio.gather(*(result for _, result in pending), return_exceptions=True)
+        for (controller, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                self.logger.error("Exception during cleanup of %s: %s", controller.name, result)
 
 
 # 全局控制器注册中心实例
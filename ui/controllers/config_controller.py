@@ -3,9 +3,116 @@
 负责处理所有配置相关的业务逻辑，包括LLM配置、嵌入模型配置等
 """
 import asyncio
-from typing import Dict, Any, Optional, List
-from .base_controller import BaseController, ControllerState, ControllerEvent
-from config_manager import test_llm_config, test_embedding_config
+import copy
+import functools
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable, Tuple
+from .base_controller import BaseController, ControllerState, run_blocking
+from ..config_models import LLMConfig, _from_dict
+
+
+def _config_fingerprint(config_data: Dict[str, Any]) -> bytes:
+    """计算配置内容指纹，键顺序不影响结果"""
+    payload = json.dumps(config_data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+
+def _snapshot_config(config_data: Dict[str, Any]) -> Dict[str, Any]:
+    """复制配置数据，断开与调用方持有对象的引用关系"""
+    try:
+        # 纯JSON结构走C实现的序列化往返，比deepcopy更快
+        return json.loads(json.dumps(config_data, ensure_ascii=False))
+    except (TypeError, ValueError):
+        return copy.deepcopy(config_data)
+
+
+# 验证结果缓存容量
+_VALIDATION_CACHE_SIZE = 64
+
+# LLM配置必需字段（按检查顺序），其中api_key允许为空
+_REQUIRED_LLM_FIELD_ORDER = ("api_key", "base_url", "model_name", "interface_format")
+_REQUIRED_LLM_FIELDS = frozenset(_REQUIRED_LLM_FIELD_ORDER)
+_NON_EMPTY_LLM_FIELDS = ("base_url", "model_name", "interface_format")
+
+
+
+def _check_llm_fields(config: dict) -> Optional[Tuple[Any, ...]]:
+    """
+    检查LLM配置字段，校验规则直接写在函数体中，无需每次遍历规则表
+    通过时返回None，失败时返回(日志格式, 参数...)，仅在失败时格式化消息
+    """
+    # 检查必需字段
+    if not _REQUIRED_LLM_FIELDS.issubset(config.keys()):
+        missing = next(field for field in _REQUIRED_LLM_FIELD_ORDER if field not in config)
+        return "LLM配置缺少必需字段: %s", missing
+    
+    # api_key可以为空，其他字段不能为空
+    if not (config["base_url"] and config["model_name"] and config["interface_format"]):
+        empty = next(field for field in _NON_EMPTY_LLM_FIELDS if not config[field])
+        return "LLM配置字段 '%s' 不能为空", empty
+    
+    # 验证数值类型字段
+    if "temperature" in config:
+        try:
+            temp = float(config["temperature"])
+        except (ValueError, TypeError):
+            return "temperature必须是数值类型，当前值: %s", config["temperature"]
+        if not (0 <= temp <= 2):
+            return "temperature必须在0-2之间，当前值: %s", temp
+    
+    if "max_tokens" in config:
+        try:
+            tokens = int(config["max_tokens"])
+        except (ValueError, TypeError):
+            return "max_tokens必须是整数类型，当前值: %s", config["max_tokens"]
+        if tokens <= 0:
+            return "max_tokens必须大于0，当前值: %s", tokens
+    
+    if "timeout" in config:
+        try:
+            timeout = int(config["timeout"])
+        except (ValueError, TypeError):
+            return "timeout必须是整数类型，当前值: %s", config["timeout"]
+        if timeout <= 0:
+            return "timeout必须大于0，当前值: %s", timeout
+    
+    return None
+
+
+# LLM测试异常的分类规则，按优先级排列；预编译后每条规则只扫描一次字符串
+_LLM_ERROR_PATTERNS = (
+    (re.compile(r"api_key", re.IGNORECASE), "**API Key错误** - 请检查API Key是否正确配置"),
+    (re.compile(r"connection|timeout", re.IGNORECASE), "**网络连接错误** - 请检查网络连接和Base URL是否正确"),
+    (re.compile(r"unauthorized|401", re.IGNORECASE), "**认证失败** - 请检查API Key是否有效"),
+    (re.compile(r"not found|404", re.IGNORECASE), "**API地址错误** - 请检查Base URL是否正确"),
+    (re.compile(r"model", re.IGNORECASE), "**模型错误** - 请检查模型名称是否正确"),
+)
+
+# LLM连接测试的必填参数及对应的缺失提示
+_TEST_REQUIRED_FIELDS = ("api_key", "base_url", "model_name")
+_TEST_MISSING_MESSAGES = (
+    "**API Key未配置** - 请在配置中填入有效的API Key",
+    "**Base URL未配置** - 请在配置中填入有效的API地址",
+    "**模型名称未配置** - 请在配置中填入有效的模型名称",
+)
+
+# 同时进行的连接测试上限，控制对外API请求并发
+_MAX_CONCURRENT_TESTS = 4
+
+# 连接测试成功结果的有效期（秒），有效期内重复测试同一配置直接返回
+_TEST_RESULT_TTL = 30.0
+
+# 配置条目数超过该阈值时，将当前配置提取放到工作线程执行，避免阻塞事件循环
+_OFFLOAD_EXTRACT_THRESHOLD = 32
+
+# 完整配置数据必需字段
+_REQUIRED_CFG_FIELDS = frozenset(("llm_configs", "embedding_configs"))
 
 
 class ConfigController(BaseController):
@@ -17,13 +124,75 @@ class ConfigController(BaseController):
     def __init__(self):
         super().__init__("ConfigController")
         self._current_llm_config = None
+        self._current_llm_config_name: Optional[str] = None
         self._current_embedding_config = None
+        # 赋值时同时绑定llm_configs/embedding_configs子字典的引用
         self._config_cache = {}
+        # 配置文件I/O专用线程池，不与默认执行器中的生成任务争用
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        # 连接测试专用线程池，池大小即并发上限，批量测试不会占满配置读写线程
+        self._net_pool: Optional[ThreadPoolExecutor] = None
+        # 最近一次成功保存的配置指纹，内容未变化时跳过写盘
+        self._last_saved_hash: Optional[bytes] = None
+        # 已通过验证的配置指纹（LRU），只缓存成功结果以保留失败时的日志
+        self._validation_cache = OrderedDict()
+        # 最近通过的连接测试：配置指纹 -> 通过时间
+        self._test_results: Dict[Any, float] = {}
+        # 进行中的操作，同一键的重复请求共享同一个任务
+        self._inflight: Dict[Any, asyncio.Future] = {}
+        # Model/View方法缓存，设置时解析一次，避免每次调用hasattr
+        self._bind_model_methods(None)
+        self._bind_view_methods(None)
+    
+    @property
+    def _config_cache(self) -> Dict[str, Any]:
+        """配置缓存"""
+        return self._config_data
+    
+    @_config_cache.setter
+    def _config_cache(self, config_data: Dict[str, Any]):
+        """
+        替换配置缓存，并直接持有两个配置子字典，读写时无需逐层查找
+        顶层浅复制后再补齐子字典，不修改调用方传入的字典；值为null时按空字典处理
+        """
+        self._llm_configs: Dict[str, Any] = config_data.get("llm_configs") or {}
+        self._embedding_configs: Dict[str, Any] = config_data.get("embedding_configs") or {}
+        self._config_data = dict(
+            config_data,
+            llm_configs=self._llm_configs,
+            embedding_configs=self._embedding_configs
+        )
+    
+    def on_model_set(self, model):
+        """Model设置完成后缓存其可选方法"""
+        self._bind_model_methods(model)
+    
+    def _bind_model_methods(self, model):
+        """解析Model的可选方法，不存在时为None"""
+        self._model_load_configuration = getattr(model, 'load_configuration', None)
+        self._model_get_current_config = getattr(model, '_get_current_config', None)
+        self._model_save_config = getattr(model, 'save_config', None)
+        self._model_save_configuration = getattr(model, 'save_configuration', None)
+        self._model_add_llm_config = getattr(model, 'add_llm_config', None)
+        self._model_remove_llm_config = getattr(model, 'remove_llm_config', None)
+        self._model_update_llm_config = getattr(model, 'update_llm_config', None)
+    
+    def on_view_set(self, view):
+        """View设置完成后缓存其可选方法"""
+        self._bind_view_methods(view)
+    
+    def _bind_view_methods(self, view):
+        """解析View的可选方法，不存在时为None"""
+        self._view_show_success = getattr(view, 'show_success', None)
+        self._view_show_error = getattr(view, 'show_error', None)
+        self._view_update_config_display = getattr(view, 'update_config_display', None)
+        self._view_safe_log = getattr(view, 'safe_log', None)
+        self._view_handle_exception = getattr(view, 'handle_exception', None)
     
     async def initialize(self) -> bool:
         """初始化配置控制器"""
         try:
-            self.set_state(ControllerState.PROCESSING)
+            self._set_state_transition(ControllerState.PROCESSING)
             
             # 验证Model依赖项（View可选）
             if self._model is None:
@@ -35,7 +204,8 @@ class ConfigController(BaseController):
             success = await self.load_configuration()
             
             if success:
-                self.set_state(ControllerState.COMPLETED)
+                # load_configuration成功时已切换到COMPLETED
+                self._set_state_transition(ControllerState.COMPLETED)
                 self.logger.info("配置控制器初始化完成")
                 return True
             else:
@@ -48,38 +218,59 @@ class ConfigController(BaseController):
     
     async def cleanup(self):
         """清理资源"""
-        self._config_cache.clear()
+        self._config_cache = {}
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=False)
+            self._io_pool = None
+        if self._net_pool is not None:
+            self._net_pool.shutdown(wait=False)
+            self._net_pool = None
         self.logger.info("配置控制器已清理")
     
+    async def _run_io(self, func: Callable, *args, **kwargs):
+        """在配置专用线程池中执行阻塞调用"""
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cfg-io")
+        return await run_blocking(func, *args, executor=self._io_pool, **kwargs)
+    
+    async def _run_network(self, func: Callable, *args, **kwargs):
+        """在连接测试专用线程池中执行网络调用，同时进行的测试数受线程池大小限制"""
+        if self._net_pool is None:
+            self._net_pool = ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_TESTS, thread_name_prefix="cfg-net")
+        return await run_blocking(func, *args, executor=self._net_pool, **kwargs)
+    
     async def load_configuration(self) -> bool:
         """加载配置文件"""
         try:
-            self.set_state(ControllerState.PROCESSING)
+            # 由initialize调用时已处于PROCESSING
+            self._set_state_transition(ControllerState.PROCESSING)
             
             # 从Model加载配置
-            if hasattr(self.model, 'load_configuration'):
+            if self._model_load_configuration is not None:
+                # 文件内容可能已被外部修改，之前保存的哈希不再代表磁盘上的内容
+                self._last_saved_hash = None
                 # ConfigurationManager的方法是load_configuration，不是load_config
-                success = await asyncio.to_thread(self.model.load_configuration)
+                success, config_data = await self._run_io(self._load_model_config)
                 
                 if success:
-                    # 获取配置数据
-                    config_data = await asyncio.to_thread(self.model._get_current_config)
-                    
                     if config_data:
                         self._config_cache = config_data
-                        self._extract_current_configs(config_data)
+                        await self._extract_current_configs_async()
+                        
+                        # 批量检查已加载的LLM配置，无效项汇总为一条日志
+                        invalid = self._iter_validate_llm_configs(self._llm_configs)
+                        if invalid:
+                            self.logger.error(
+                                "以下LLM配置无效:\n%s",
+                                "\n".join(f"{name}: {message}" for name, message in invalid)
+                            )
                         
                         # 通知View更新
-                        if hasattr(self.view, 'update_config_display'):
-                            self.view.update_config_display(config_data)
+                        if self._view_update_config_display:
+                            self._view_update_config_display(config_data)
                         
                         # 发出配置加载完成事件
-                        event = ControllerEvent(
-                            event_type="config_loaded",
-                            source=self.name,
-                            data=config_data
-                        )
-                        self.emit_event(event)
+                        self._emit("config_loaded", config_data)
                         
                         self.set_state(ControllerState.COMPLETED)
                         return True
@@ -99,41 +290,80 @@ class ConfigController(BaseController):
             self._handle_error(e, "加载配置")
             return False
     
+    def _load_model_config(self):
+        """加载并读取Model配置，在工作线程中一次完成，避免多次线程切换"""
+        if not self._model_load_configuration():
+            return False, None
+        return True, self._model_get_current_config()
+    
+    async def _dedupe(self, key, coro_factory: Callable):
+        """同一键已有进行中的任务时直接等待其结果，否则新建任务"""
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        # 界面每次调用都可能使用新的事件循环（或来自其他线程），只复用属于当前循环的任务
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(coro_factory())
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._discard_inflight, key))
+        # shield：某个等待方被取消时不影响共享任务
+        return await asyncio.shield(task)
+    
+    def _discard_inflight(self, key, task: asyncio.Future):
+        """任务结束时移除登记，已被其他循环的新任务替换时保留新任务"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+    
     async def save_configuration(self, config_data: Dict[str, Any]) -> bool:
-        """保存配置文件"""
+        """保存配置文件，内容相同的并发保存请求只执行一次"""
+        try:
+            config_hash = _config_fingerprint(config_data)
+        except Exception as e:
+            self._handle_error(e, "保存配置")
+            return False
+        return await self._dedupe(
+            ("save", config_hash),
+            lambda: self._save_configuration(config_data, config_hash)
+        )
+    
+    async def _save_configuration(self, config_data: Dict[str, Any], config_hash: bytes) -> bool:
+        """执行配置保存"""
         try:
             self.set_state(ControllerState.PROCESSING)
             
             # 验证配置数据
-            if not self._validate_config_data(config_data):
+            if not self._validate_config_data(config_data, fingerprint=config_hash):
                 self.set_state(ControllerState.ERROR)
                 return False
             
             # 保存到Model
-            if hasattr(self.model, 'save_config'):
-                success = await asyncio.to_thread(self.model.save_config, config_data)
+            if self._model_save_config is not None:
+                if config_hash == self._last_saved_hash:
+                    # 内容与上次保存一致，无需重复写盘
+                    if self._view_show_success:
+                        self._view_show_success("**配置保存成功**")
+                    self.set_state(ControllerState.COMPLETED)
+                    return True
+                
+                success = await self._run_io(self._model_save_config, config_data)
                 
                 if success:
-                    self._config_cache = config_data
-                    self._extract_current_configs(config_data)
+                    self._last_saved_hash = config_hash
+                    # 保存快照，调用方后续修改自己的字典不会影响缓存
+                    self._config_cache = _snapshot_config(config_data)
+                    await self._extract_current_configs_async()
                     
                     # 通知View更新
-                    if hasattr(self.view, 'show_success'):
-                        self.view.show_success("**配置保存成功**")
+                    if self._view_show_success:
+                        self._view_show_success("**配置保存成功**")
                     
                     # 发出配置保存完成事件
-                    event = ControllerEvent(
-                        event_type="config_saved",
-                        source=self.name,
-                        data=config_data
-                    )
-                    self.emit_event(event)
+                    self._emit("config_saved", config_data)
                     
                     self.set_state(ControllerState.COMPLETED)
                     return True
                 else:
-                    if hasattr(self.view, 'show_error'):
-                        self.view.show_error("**配置保存失败**")
+                    if self._view_show_error:
+                        self._view_show_error("**配置保存失败**")
                     self.set_state(ControllerState.ERROR)
                     return False
             else:
@@ -145,54 +375,94 @@ class ConfigController(BaseController):
             return False
     
     async def test_llm_configuration(self, config_name: str = None) -> bool:
-        """测试LLM配置"""
+        """测试LLM配置，同一配置的并发测试请求只执行一次"""
+        return await self._dedupe(
+            ("test_llm", config_name),
+            lambda: self._run_llm_test_with_state(config_name)
+        )
+    
+    async def _run_llm_test_with_state(self, config_name: str = None) -> bool:
+        """执行LLM配置测试并更新控制器状态"""
+        self.set_state(ControllerState.PROCESSING)
+        success = await self._test_llm_configuration(config_name)
+        self.set_state(ControllerState.COMPLETED if success else ControllerState.ERROR)
+        return success
+    
+    async def test_embedding_configuration(self, interface_format: str = "OpenAI") -> bool:
+        """测试嵌入模型配置，同一接口的并发测试请求只执行一次"""
+        return await self._dedupe(
+            ("test_embedding", interface_format),
+            lambda: self._run_embedding_test_with_state(interface_format)
+        )
+    
+    async def _run_embedding_test_with_state(self, interface_format: str = "OpenAI") -> bool:
+        """执行嵌入模型配置测试并更新控制器状态"""
         try:
             self.set_state(ControllerState.PROCESSING)
-            
+            success = await self._test_embedding_configuration(interface_format)
+            self.set_state(ControllerState.COMPLETED if success else ControllerState.ERROR)
+            return success
+        except Exception as e:
+            self._handle_error(e, "测试嵌入模型配置")
+            return False
+    
+    async def test_all_configurations(self, llm_name: str = None, embedding_format: str = "OpenAI") -> bool:
+        """
+        并发测试LLM与嵌入模型配置
+        两个测试只返回各自结果，待全部完成后再统一设置控制器状态
+        """
+        self.set_state(ControllerState.PROCESSING)
+        llm_result, embedding_result = await asyncio.gather(
+            self._test_llm_configuration(llm_name),
+            self._test_embedding_configuration(embedding_format),
+            return_exceptions=True
+        )
+        
+        if isinstance(embedding_result, Exception):
+            self._handle_error(embedding_result, "测试嵌入模型配置")
+            embedding_result = False
+        if isinstance(llm_result, Exception):
+            self._handle_error(llm_result, "测试LLM配置")
+            llm_result = False
+        
+        success = llm_result and embedding_result
+        self.set_state(ControllerState.COMPLETED if success else ControllerState.ERROR)
+        return success
+    
+    async def _test_llm_configuration(self, config_name: str = None) -> bool:
+        """执行LLM配置测试，不修改控制器状态"""
+        try:
             # 获取要测试的配置
             if config_name:
                 llm_config = self._get_llm_config_by_name(config_name)
+            elif self._current_llm_config_name is not None:
+                # 按名称查找，缓存中的配置被更新后仍能取到最新值
+                llm_config = self._get_llm_config_by_name(self._current_llm_config_name)
             else:
                 llm_config = self._current_llm_config
             
             if not llm_config:
                 error_msg = "**未找到LLM配置**"
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error(error_msg)
+                if self._view_show_error:
+                    self._view_show_error(error_msg)
                 self.logger.error(error_msg)
-                self.set_state(ControllerState.ERROR)
                 return False
             
-            # 检查必要的配置参数
-            api_key = llm_config.get("api_key", "").strip()
-            if not api_key:
-                error_msg = "**API Key未配置** - 请在配置中填入有效的API Key"
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error(error_msg)
+            # 检查必要的配置参数，一次取出后统一判断
+            values = [llm_config.get(field, "").strip() for field in _TEST_REQUIRED_FIELDS]
+            if not all(values):
+                error_msg = _TEST_MISSING_MESSAGES[values.index("")]
+                if self._view_show_error:
+                    self._view_show_error(error_msg)
                 self.logger.error(error_msg)
-                self.set_state(ControllerState.ERROR)
-                return False
-            
-            base_url = llm_config.get("base_url", "").strip()
-            if not base_url:
-                error_msg = "**Base URL未配置** - 请在配置中填入有效的API地址"
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error(error_msg)
-                self.logger.error(error_msg)
-                self.set_state(ControllerState.ERROR)
-                return False
-            
-            model_name = llm_config.get("model_name", "").strip()
-            if not model_name:
-                error_msg = "**模型名称未配置** - 请在配置中填入有效的模型名称"
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error(error_msg)
-                self.logger.error(error_msg)
-                self.set_state(ControllerState.ERROR)
                 return False
+            api_key, base_url, model_name = values
             
             # 执行测试 - 需要传递正确的参数
-            success = await asyncio.to_thread(
+            # 测试函数依赖各LLM SDK，首次测试时才导入
+            from config_manager import test_llm_config
+            test_key = ("llm", _config_fingerprint(llm_config))
+            success = self._recently_passed(test_key) or await self._run_network(
                 test_llm_config,
                 interface_format=llm_config.get("interface_format"),
                 api_key=api_key,
@@ -201,107 +471,90 @@ class ConfigController(BaseController):
                 temperature=llm_config.get("temperature", 0.7),
                 max_tokens=llm_config.get("max_tokens", 8192),
                 timeout=llm_config.get("timeout", 600),
-                log_func=self.view.safe_log if hasattr(self.view, 'safe_log') else print,
-                handle_exception_func=self.view.handle_exception if hasattr(self.view, 'handle_exception') else lambda x: None
+                log_func=self._view_safe_log or print,
+                handle_exception_func=self._view_handle_exception or (lambda x: None)
             )
             
             if success:
+                self._test_results[test_key] = time.monotonic()
                 success_msg = "**LLM配置测试成功** ✅"
-                if hasattr(self.view, 'show_success'):
-                    self.view.show_success(success_msg)
+                if self._view_show_success:
+                    self._view_show_success(success_msg)
                 self.logger.info(success_msg)
                 
                 # 发出测试成功事件
-                event = ControllerEvent(
-                    event_type="llm_test_success",
-                    source=self.name,
-                    data=llm_config
-                )
-                self.emit_event(event)
-                
-                self.set_state(ControllerState.COMPLETED)
+                self._emit("llm_test_success", llm_config)
                 return True
             else:
                 error_msg = "**LLM配置测试失败** ❌ - 请检查网络连接和配置参数"
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error(error_msg)
+                if self._view_show_error:
+                    self._view_show_error(error_msg)
                 self.logger.error(error_msg)
-                self.set_state(ControllerState.ERROR)
                 return False
                 
         except Exception as e:
             # 根据异常类型提供更具体的错误信息
             error_str = str(e)
             
-            if "api_key" in error_str.lower():
-                friendly_msg = "**API Key错误** - 请检查API Key是否正确配置"
-            elif "connection" in error_str.lower() or "timeout" in error_str.lower():
-                friendly_msg = "**网络连接错误** - 请检查网络连接和Base URL是否正确"
-            elif "unauthorized" in error_str.lower() or "401" in error_str:
-                friendly_msg = "**认证失败** - 请检查API Key是否有效"
-            elif "not found" in error_str.lower() or "404" in error_str:
-                friendly_msg = "**API地址错误** - 请检查Base URL是否正确"
-            elif "model" in error_str.lower():
-                friendly_msg = "**模型错误** - 请检查模型名称是否正确"
+            for pattern, message in _LLM_ERROR_PATTERNS:
+                if pattern.search(error_str):
+                    friendly_msg = message
+                    break
             else:
                 friendly_msg = f"**LLM配置测试异常** - {error_str}"
             
-            if hasattr(self.view, 'show_error'):
-                self.view.show_error(friendly_msg)
+            if self._view_show_error:
+                self._view_show_error(friendly_msg)
             
-            self.logger.error(f"测试LLM配置异常: {error_str}")
-            self.set_state(ControllerState.ERROR)
+            self.logger.error("测试LLM配置异常: %s", error_str)
             return False
     
-    async def test_embedding_configuration(self, interface_format: str = "OpenAI") -> bool:
-        """测试嵌入模型配置"""
-        try:
-            self.set_state(ControllerState.PROCESSING)
-            
-            # 获取嵌入模型配置
-            embedding_config = self._get_embedding_config_by_format(interface_format)
-            
-            if not embedding_config:
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error("**未找到嵌入模型配置**")
-                self.set_state(ControllerState.ERROR)
-                return False
-            
-            # 执行测试 - 需要传递正确的参数
-            success = await asyncio.to_thread(
-                test_embedding_config,
-                api_key=embedding_config.get("api_key"),
-                base_url=embedding_config.get("base_url"),
-                interface_format=embedding_config.get("interface_format"),
-                model_name=embedding_config.get("model_name"),
-                log_func=self.view.safe_log if hasattr(self.view, 'safe_log') else print,
-                handle_exception_func=self.view.handle_exception if hasattr(self.view, 'handle_exception') else lambda x: None
-            )
+    async def _test_embedding_configuration(self, interface_format: str = "OpenAI") -> bool:
+        """执行嵌入模型配置测试，不修改控制器状态，异常交由调用方处理"""
+        # 获取嵌入模型配置
+        embedding_config = self._get_embedding_config_by_format(interface_format)
+        
+        if not embedding_config:
+            if self._view_show_error:
+                self._view_show_error("**未找到嵌入模型配置**")
+            return False
+        
+        # 执行测试 - 需要传递正确的参数
+        from config_manager import test_embedding_config
+        test_key = ("embedding", _config_fingerprint(embedding_config))
+        success = self._recently_passed(test_key) or await self._run_network(
+            test_embedding_config,
+            api_key=embedding_config.get("api_key"),
+            base_url=embedding_config.get("base_url"),
+            interface_format=embedding_config.get("interface_format"),
+            model_name=embedding_config.get("model_name"),
+            log_func=self._view_safe_log or print,
+            handle_exception_func=self._view_handle_exception or (lambda x: None)
+        )
+        
+        if success:
+            self._test_results[test_key] = time.monotonic()
+            if self._view_show_success:
+                self._view_show_success("**嵌入模型配置测试成功**")
             
-            if success:
-                if hasattr(self.view, 'show_success'):
-                    self.view.show_success("**嵌入模型配置测试成功**")
-                
-                # 发出测试成功事件
-                event = ControllerEvent(
-                    event_type="embedding_test_success",
-                    source=self.name,
-                    data=embedding_config
-                )
-                self.emit_event(event)
-                
-                self.set_state(ControllerState.COMPLETED)
-                return True
-            else:
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error("**嵌入模型配置测试失败**")
-                self.set_state(ControllerState.ERROR)
-                return False
-                
-        except Exception as e:
-            self._handle_error(e, "测试嵌入模型配置")
+            # 发出测试成功事件
+            self._emit("embedding_test_success", embedding_config)
+            return True
+        else:
+            if self._view_show_error:
+                self._view_show_error("**嵌入模型配置测试失败**")
             return False
     
+    def _recently_passed(self, test_key) -> bool:
+        """同一配置是否在有效期内测试通过（只缓存成功结果，失败时总是重新测试）"""
+        passed_at = self._test_results.get(test_key)
+        if passed_at is None:
+            return False
+        if time.monotonic() - passed_at < _TEST_RESULT_TTL:
+            return True
+        del self._test_results[test_key]
+        return False
+    
     def get_current_llm_config(self) -> Optional[Dict[str, Any]]:
         """获取当前LLM配置"""
         return self._current_llm_config
@@ -316,92 +569,72 @@ class ConfigController(BaseController):
 
     def set_current_llm_config(self, config_name: str) -> bool:
         """设置当前LLM配置"""
-        try:
-            # **验证配置是否存在**
-            config = self._get_llm_config_by_name(config_name)
-            if not config:
-                self.logger.warning(f"LLM配置 '{config_name}' 不存在")
-                return False
-            
-            # **更新当前配置**
-            self._current_llm_config = config
-            self._current_llm_config_name = config_name
-            
-            # **发出配置变更事件**
-            event = ControllerEvent(
-                event_type="llm_config_changed",
-                source=self.name,
-                data={
-                    "config_name": config_name,
-                    "config": config
-                }
-            )
-            self.emit_event(event)
-            
-            self.logger.info(f"当前LLM配置已设置为: {config_name}")
-            return True
-            
-        except Exception as e:
-            self._handle_error(e, f"设置当前LLM配置失败: {config_name}")
+        # **验证配置是否存在**
+        config = self._get_llm_config_by_name(config_name)
+        if not config:
+            self.logger.warning("LLM配置 '%s' 不存在", config_name)
             return False
+        
+        # **更新当前配置**
+        self._current_llm_config = config
+        self._current_llm_config_name = config_name
+        
+        # **发出配置变更事件**（监听器异常由事件分发内部处理）
+        self._emit("llm_config_changed", {"config_name": config_name, "config": config})
+        
+        self.logger.info("当前LLM配置已设置为: %s", config_name)
+        return True
 
     def add_llm_config(self, name: str, config: dict) -> bool:
         """添加LLM配置"""
-        try:
-            if not self._validate_llm_config(config):
-                self.handle_error(ValueError("无效的LLM配置"), "配置验证失败")
-                return False
-            
-            # 检查配置是否已存在
-            llm_configs = self._config_cache.get("llm_configs", {})
-            if name in llm_configs:
-                self.logger.warning(f"LLM配置 '{name}' 已存在")
-                return False
-            
-            llm_configs[name] = config
-            self._config_cache["llm_configs"] = llm_configs
-            
-            # 同步到Model层（如果可用）
-            if hasattr(self, 'model') and self.model and hasattr(self.model, 'add_llm_config'):
-                self.model.add_llm_config(name, config)
-            
-            event = ControllerEvent(
-                event_type="llm_config_added",
-                source=self.name,
-                data={"name": name, "config": config}
-            )
-            self.emit_event(event)
-            self.logger.info(f"LLM配置已添加: {name}")
-            return True
-            
-        except Exception as e:
-            self._handle_error(e, "添加LLM配置失败")
+        if not self._validate_llm_config(config):
+            self._handle_error(ValueError("无效的LLM配置"), "配置验证失败")
+            return False
+        
+        # 检查配置是否已存在
+        llm_configs = self._llm_configs
+        if name in llm_configs:
+            self.logger.warning("LLM配置 '%s' 已存在", name)
             return False
+        
+        llm_configs[name] = config
+        self._test_results.clear()
+        # Model层可能直接写入配置文件，下次保存不能再按哈希跳过
+        self._last_saved_hash = None
+        
+        # 同步到Model层（如果可用）
+        if self._model_add_llm_config is not None:
+            try:
+                self._model_add_llm_config(name, config)
+            except Exception as e:
+                self._handle_error(e, "添加LLM配置失败")
+                return False
+        
+        self._emit("llm_config_added", {"name": name, "config": config})
+        self.logger.info("LLM配置已添加: %s", name)
+        return True
     
     def remove_llm_config(self, name: str) -> bool:
         """移除LLM配置"""
-        try:
-            llm_configs = self._config_cache.get("llm_configs", {})
-            if name in llm_configs:
-                del llm_configs[name]
-                
-                # 同步到Model层（如果可用）
-                if hasattr(self, 'model') and self.model and hasattr(self.model, 'remove_llm_config'):
-                    self.model.remove_llm_config(name)
-                
-                event = ControllerEvent(
-                    event_type="llm_config_removed",
-                    source=self.name,
-                    data={"name": name}
-                )
-                self.emit_event(event)
-                self.logger.info(f"LLM配置已移除: {name}")
-                return True
-            return False
-            
-        except Exception as e:
-            self._handle_error(e, "移除LLM配置失败")
+        llm_configs = self._llm_configs
+        if name not in llm_configs:
             return False
+        
+        del llm_configs[name]
+        self._test_results.clear()
+        self._last_saved_hash = None
+        
+        # 同步到Model层（如果可用）
+        if self._model_remove_llm_config is not None:
+            try:
+                self._model_remove_llm_config(name)
+            except Exception as e:
+                self._handle_error(e, "移除LLM配置失败")
+                return False
+        
+        self._emit("llm_config_removed", {"name": name})
+        self.logger.info("LLM配置已移除: %s", name)
+        return True
     
     def update_llm_config(self, config_name: str, config_data: dict) -> bool:
         """
@@ -417,137 +650,145 @@ class ConfigController(BaseController):
         try:
             # 验证配置数据
             if not self._validate_llm_config(config_data):
-                self.logger.error(f"无效的LLM配置数据: {config_name}")
+                self.logger.error("无效的LLM配置数据: %s", config_name)
                 return False
             
             # 更新缓存中的配置
-            if "llm_configs" not in self._config_cache:
-                self._config_cache["llm_configs"] = {}
-            
-            self._config_cache["llm_configs"][config_name] = config_data
+            self._llm_configs[config_name] = config_data
+            # 下方通过Model直接写入文件，绕过了save_configuration的哈希记录
+            self._last_saved_hash = None
             
             # 如果有Model层，同步更新
-            self.logger.debug(f"检查model是否存在update_llm_config方法: model={self.model}, type={type(self.model)}")
-            self.logger.debug(f"hasattr(self.model, 'update_llm_config'): {hasattr(self.model, 'update_llm_config') if self.model else 'model is None'}")
-            
-            if hasattr(self.model, 'update_llm_config'):
-                self.logger.debug(f"进入model同步更新分支，配置名称: {config_name}")
-                from ui.config_models import LLMConfig
-                llm_config = LLMConfig(**config_data)
-                self.logger.debug(f"创建LLMConfig对象: {llm_config}")
-                self.model.update_llm_config(config_name, llm_config)
-                self.logger.debug(f"model.update_llm_config调用完成")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("检查model是否存在update_llm_config方法: model=%s, type=%s", self.model, type(self.model))
+                self.logger.debug("model.update_llm_config可用: %s", self._model_update_llm_config is not None)
+            
+            if self._model_update_llm_config is not None:
+                self.logger.debug("进入model同步更新分支，配置名称: %s", config_name)
+                # 配置已通过验证，按字段表直接构建，忽略界面附带的额外键
+                llm_config = _from_dict(LLMConfig, config_data)
+                self.logger.debug("创建LLMConfig对象: %s", llm_config)
+                self._model_update_llm_config(config_name, llm_config)
+                self.logger.debug("model.update_llm_config调用完成")
             else:
-                self.logger.warning(f"跳过model同步更新: model={self.model}, hasattr结果={hasattr(self.model, 'update_llm_config') if self.model else 'model is None'}")
+                self.logger.warning("跳过model同步更新: model=%s", self.model)
             
             # 自动保存配置到文件
             try:
-                if hasattr(self.model, 'save_configuration'):
-                    save_success = self.model.save_configuration()
+                if self._model_save_configuration is not None:
+                    save_success = self._model_save_configuration()
                     if save_success:
-                        self.logger.info(f"LLM配置已保存到文件: {config_name}")
+                        self.logger.info("LLM配置已保存到文件: %s", config_name)
                     else:
-                        self.logger.warning(f"LLM配置保存到文件失败: {config_name}")
+                        self.logger.warning("LLM配置保存到文件失败: %s", config_name)
                 else:
                     self.logger.warning("Model层不支持save_configuration方法")
             except Exception as save_error:
-                self.logger.error(f"保存配置文件时出错: {save_error}")
+                self.logger.error("保存配置文件时出错: %s", save_error)
             
             # 发出配置更新事件
-            event = ControllerEvent(
-                event_type="llm_config_updated",
-                source=self.name,
-                data={"name": config_name, "config": config_data}
-            )
-            self.emit_event(event)
+            self._emit("llm_config_updated", {"name": config_name, "config": config_data})
             
-            self.logger.info(f"LLM配置已更新: {config_name}")
+            self.logger.info("LLM配置已更新: %s", config_name)
             return True
             
         except Exception as e:
-            self._handle_error(e, f"更新LLM配置失败: {config_name}")
+            self.logger.error("更新LLM配置失败: %s", config_name)
+            self._handle_error(e, "更新LLM配置")
             return False
     
+    def _is_validated(self, key) -> bool:
+        """查询验证缓存"""
+        if key is not None and key in self._validation_cache:
+            self._validation_cache.move_to_end(key)
+            return True
+        return False
+    
+    def _remember_validated(self, key):
+        """记录通过验证的配置指纹"""
+        if key is None:
+            return
+        self._validation_cache[key] = True
+        if len(self._validation_cache) > _VALIDATION_CACHE_SIZE:
+            self._validation_cache.popitem(last=False)
+    
     def _validate_llm_config(self, config: dict) -> bool:
         """验证LLM配置的有效性"""
         if not isinstance(config, dict):
-            self.logger.error(f"LLM配置必须是字典类型，当前类型: {type(config)}")
+            self.logger.error("LLM配置必须是字典类型，当前类型: %s", type(config))
             return False
-            
-        required_fields = ["api_key", "base_url", "model_name", "interface_format"]
-        optional_fields = ["temperature", "max_tokens", "timeout"]
-        
-        # 检查必需字段
-        for field in required_fields:
-            if field not in config:
-                self.logger.error(f"LLM配置缺少必需字段: {field}")
-                return False
-            # api_key可以为空，其他字段不能为空
-            if field != "api_key" and not config[field]:
-                self.logger.error(f"LLM配置字段 '{field}' 不能为空")
-                return False
-        
-        # 验证数值类型字段
-        if "temperature" in config:
-            try:
-                temp = float(config["temperature"])
-                if not (0 <= temp <= 2):
-                    self.logger.error(f"temperature必须在0-2之间，当前值: {temp}")
-                    return False
-            except (ValueError, TypeError):
-                self.logger.error(f"temperature必须是数值类型，当前值: {config['temperature']}")
-                return False
         
-        if "max_tokens" in config:
-            try:
-                tokens = int(config["max_tokens"])
-                if tokens <= 0:
-                    self.logger.error(f"max_tokens必须大于0，当前值: {tokens}")
-                    return False
-            except (ValueError, TypeError):
-                self.logger.error(f"max_tokens必须是整数类型，当前值: {config['max_tokens']}")
-                return False
-        
-        if "timeout" in config:
-            try:
-                timeout = int(config["timeout"])
-                if timeout <= 0:
-                    self.logger.error(f"timeout必须大于0，当前值: {timeout}")
-                    return False
-            except (ValueError, TypeError):
-                self.logger.error(f"timeout必须是整数类型，当前值: {config['timeout']}")
-                return False
+        # LLM配置的值均为标量，可直接以键值对集合作为缓存键
+        try:
+            cache_key = ("llm", frozenset(config.items()))
+        except TypeError:
+            cache_key = None
+        if self._is_validated(cache_key):
+            return True
         
+        if not self._check_llm_config(config):
+            return False
+        self._remember_validated(cache_key)
         return True
     
+    def _check_llm_config(self, config: dict) -> bool:
+        """逐项检查LLM配置字段"""
+        error = _check_llm_fields(config)
+        if error is not None:
+            self.logger.error(*error)
+            return False
+        return True
+    
+    def _iter_validate_llm_configs(self, configs: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """批量验证LLM配置，返回无效配置的(名称, 错误信息)列表，不逐条写日志"""
+        check = _check_llm_fields
+        errors = []
+        for name, config in configs.items():
+            if type(config) is not dict:
+                errors.append((name, "LLM配置必须是字典类型"))
+                continue
+            error = check(config)
+            if error is not None:
+                errors.append((name, error[0] % error[1:]))
+        return errors
+    
     def get_llm_config_names(self) -> List[str]:
         """获取所有LLM配置名称"""
-        llm_configs = self._config_cache.get("llm_configs", {})
-        return list(llm_configs.keys())
+        return list(self._llm_configs)
     
     def get_all_llm_configs(self) -> Dict[str, Any]:
         """获取所有LLM配置"""
-        return self._config_cache.get("llm_configs", {})
+        return self._llm_configs
     
     def get_all_embedding_configs(self) -> Dict[str, Any]:
         """获取所有嵌入模型配置"""
-        return self._config_cache.get("embedding_configs", {})
+        return self._embedding_configs
+    
+    async def _extract_current_configs_async(self):
+        """提取当前配置，配置较多时在工作线程中执行"""
+        entry_count = len(self._llm_configs) + len(self._embedding_configs)
+        if entry_count > _OFFLOAD_EXTRACT_THRESHOLD:
+            await self._run_io(self._extract_current_configs)
+        else:
+            self._extract_current_configs()
     
-    def _extract_current_configs(self, config_data: Dict[str, Any]):
-        """从配置数据中提取当前配置"""
+    def _extract_current_configs(self):
+        """从配置缓存中提取当前配置"""
+        config_data = self._config_data
         # 提取LLM配置
-        llm_configs = config_data.get("llm_configs", {})
+        llm_configs = self._llm_configs
         if llm_configs:
             # 优先使用last_llm_config_name指定的配置
             last_llm_config = config_data.get("last_llm_config_name")
             if last_llm_config and last_llm_config in llm_configs:
+                self._current_llm_config_name = last_llm_config
                 self._current_llm_config = llm_configs[last_llm_config]
             else:
-                # 获取第一个LLM配置作为当前配置
-                self._current_llm_config = next(iter(llm_configs.values()))
+                # 获取第一个LLM配置作为当前配置，同时记住其名称
+                self._current_llm_config_name, self._current_llm_config = next(iter(llm_configs.items()))
         
         # 提取嵌入模型配置
-        embedding_configs = config_data.get("embedding_configs", {})
+        embedding_configs = self._embedding_configs
         last_embedding_format = config_data.get("last_embedding_interface_format", "OpenAI")
         if last_embedding_format in embedding_configs:
             self._current_embedding_config = embedding_configs[last_embedding_format]
@@ -556,38 +797,45 @@ class ConfigController(BaseController):
     
     def _get_llm_config_by_name(self, config_name: str) -> Optional[Dict[str, Any]]:
         """根据名称获取LLM配置"""
-        llm_configs = self._config_cache.get("llm_configs", {})
-        return llm_configs.get(config_name)
+        return self._llm_configs.get(config_name)
     
     def _get_embedding_config_by_format(self, interface_format: str) -> Optional[Dict[str, Any]]:
         """根据接口格式获取嵌入模型配置"""
-        embedding_configs = self._config_cache.get("embedding_configs", {})
-        return embedding_configs.get(interface_format)
+        return self._embedding_configs.get(interface_format)
     
-    def _validate_config_data(self, config_data: Dict[str, Any]) -> bool:
-        """验证配置数据的有效性"""
-        try:
-            # 验证必要的字段
-            required_fields = ["llm_configs", "embedding_configs"]
-            for field in required_fields:
-                if field not in config_data:
-                    self.logger.error(f"配置数据缺少必要字段: {field}")
-                    return False
-            
-            # 验证LLM配置
-            llm_configs = config_data["llm_configs"]
-            if not isinstance(llm_configs, dict) or not llm_configs:
-                self.logger.error("LLM配置格式错误或为空")
-                return False
-            
-            # 验证嵌入模型配置
-            embedding_configs = config_data["embedding_configs"]
-            if not isinstance(embedding_configs, dict) or not embedding_configs:
-                self.logger.error("嵌入模型配置格式错误或为空")
-                return False
-            
+    def _validate_config_data(self, config_data: Dict[str, Any], fingerprint: Optional[bytes] = None) -> bool:
+        """验证配置数据的有效性，提供指纹时复用此前的验证结果"""
+        cache_key = ("config", fingerprint) if fingerprint is not None else None
+        if self._is_validated(cache_key):
             return True
-            
-        except Exception as e:
-            self.logger.error(f"配置数据验证失败: {e}")
-            return False
\ No newline at end of file
+        
+        if not self._check_config_data(config_data):
+            return False
+        self._remember_validated(cache_key)
+        return True
+    
+    def _check_config_data(self, config_data: Dict[str, Any]) -> bool:
+        """逐项检查配置数据字段"""
+        if type(config_data) is not dict:
+            self.logger.error("配置数据格式错误: %s", type(config_data).__name__)
+            return False
+        
+        # 验证必要的字段
+        if not _REQUIRED_CFG_FIELDS.issubset(config_data.keys()):
+            missing = _REQUIRED_CFG_FIELDS - config_data.keys()
+            self.logger.error("配置数据缺少必要字段: %s", ', '.join(sorted(missing)))
+            return False
+        
+        # 验证LLM配置（配置来自JSON，均为普通dict）
+        llm_configs = config_data["llm_configs"]
+        if type(llm_configs) is not dict or not llm_configs:
+            self.logger.error("LLM配置格式错误或为空")
+            return False
+        
+        # 验证嵌入模型配置
+        embedding_configs = config_data["embedding_configs"]
+        if type(embedding_configs) is not dict or not embedding_configs:
+            self.logger.error("嵌入模型配置格式错误或为空")
+            return False
+        
+        return True
\ No newline at end of file
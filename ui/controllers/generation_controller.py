@@ -4,13 +4,245 @@
 重构后采用模板方法模式，消除代码重复
 """
 import asyncio
+import functools
+import hashlib
+import json
+import os
 import threading
-from typing import Dict, Any, Optional, Callable
-from .base_controller import BaseController, ControllerState, ControllerEvent
-from novel_generator.architecture import Novel_architecture_generate
-from novel_generator.blueprint import Chapter_blueprint_generate
-from novel_generator.chapter import generate_chapter_draft
-from novel_generator.finalization import finalize_chapter
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Callable, List, Sequence, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from .base_controller import BaseController, ControllerState, run_blocking
+from ..config_models import DATACLASS_OPTIONS
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _env_positive_int(name: str, default: int) -> int:
+    """读取正整数环境变量，未设置或无效时使用默认值"""
+    try:
+        value = int(os.environ.get(name, default))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+# LLM生成专用线程池大小，与其他控制器的执行器隔离；可按服务商并发限制通过环境变量调整
+_LLM_WORKERS = _env_positive_int("NOVELGEN_LLM_CONCURRENCY", 16)
+
+# 这些配置控制器事件发生后，已缓存的任务LLM配置失效
+_CONFIG_CHANGE_EVENTS = (
+    "config_loaded", "config_saved", "llm_config_changed",
+    "llm_config_added", "llm_config_removed", "llm_config_updated",
+)
+
+# 各生成任务的必填参数，值为空同样视为缺失
+_ARCHITECTURE_REQUIRED_FIELDS = ('topic', 'genre', 'num_chapters', 'word_number', 'filepath')
+_CHAPTER_REQUIRED_FIELDS = ('filepath', 'chapter_num')
+_REQUIRED_PARAMS = {
+    "architecture": _ARCHITECTURE_REQUIRED_FIELDS,
+    "blueprint": ('filepath',),
+    "draft": _CHAPTER_REQUIRED_FIELDS,
+    "finalization": _CHAPTER_REQUIRED_FIELDS,
+}
+
+# 影响生成结果的LLM配置字段，参与生成缓存键计算
+_CACHE_KEY_LLM_FIELDS = ("interface_format", "base_url", "model_name", "temperature", "max_tokens")
+# 输出文件由多个章节共同写入的任务，生成缓存只检查输出文件是否存在
+_SHARED_OUTPUT_TASKS = frozenset(("finalization",))
+# 不影响生成内容的易变参数，不参与生成缓存键计算
+# force_regenerate为真时跳过缓存查询，生成成功后仍会更新缓存
+_VOLATILE_PARAM_KEYS = frozenset(("timestamp", "created_at", "updated_at", "request_id", "force_regenerate"))
+
+def _dumps_sorted(obj: Any) -> bytes:
+    """按键排序序列化，用于计算缓存键；orjson可用时优先使用"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS, default=str)
+        except TypeError:
+            # 含非字符串键等orjson不支持的数据时退回标准库
+            pass
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+
+
+# Python 3.12+ 提供的急切任务工厂：能同步完成的协程无需等待一轮事件循环调度
+_EAGER_TASK_FACTORY = getattr(asyncio, "eager_task_factory", None)
+
+# 批量生成时同时进行的章节数默认上限，可通过LLM配置的max_parallel覆盖
+_DEFAULT_BATCH_CONCURRENCY = 8
+
+
+# 任务配置创建后不再修改，冻结以防误改；提示文本在__post_init__中一次性生成
+@dataclass(frozen=True, **DATACLASS_OPTIONS)
+class TaskConfig:
+    """生成任务配置，界面提示文本在创建时生成一次"""
+    display_name: str
+    generator_func: Callable[[Dict[str, Any], Dict[str, Any]], bool]
+    required_fields: tuple
+    status_msg: str = field(init=False)
+    success_msg: str = field(init=False)
+    fail_msg: str = field(init=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "status_msg", f"**正在生成{self.display_name}...**")
+        object.__setattr__(self, "success_msg", f"**{self.display_name}生成完成**")
+        object.__setattr__(self, "fail_msg", f"**{self.display_name}生成失败**")
+
+
+def _file_digest(path: str) -> Optional[bytes]:
+    """计算文件内容摘要，文件不可读时返回None"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.blake2b(f.read(), digest_size=32).digest()
+    except OSError:
+        return None
+
+
+def _chapter_order(params: Dict[str, Any]) -> int:
+    """章节排序键，章节号无法解析时排在最前"""
+    try:
+        return int(params.get('chapter_num', 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _generation_files(task_type: str, params: Dict[str, Any]) -> Tuple[Tuple[str, ...], str]:
+    """生成任务读取的项目文件与写入的输出文件"""
+    filepath = params.get('filepath', '')
+    architecture_file = os.path.join(filepath, "Novel_architecture.txt")
+    directory_file = os.path.join(filepath, "Novel_directory.txt")
+    summary_file = os.path.join(filepath, "global_summary.txt")
+    chapter_file = os.path.join(filepath, "chapters", f"chapter_{params.get('chapter_num', '1')}.txt")
+    if task_type == "architecture":
+        return (), architecture_file
+    if task_type == "blueprint":
+        return (architecture_file,), directory_file
+    if task_type == "draft":
+        previous_file = os.path.join(filepath, "chapters", f"chapter_{_chapter_order(params) - 1}.txt")
+        return (
+            architecture_file, directory_file, summary_file,
+            os.path.join(filepath, "character_state.txt"), previous_file
+        ), chapter_file
+    return (chapter_file,), summary_file
+
+
+def _output_state(task_type: str, params: Dict[str, Any]) -> Optional[str]:
+    """
+    生成任务输出文件的状态：文件不存在时为None，否则为内容摘要
+    全局摘要由各章节定稿共同累加，其他章节定稿后内容必然变化，因此只记录是否存在
+    """
+    _, output_file = _generation_files(task_type, params)
+    if task_type in _SHARED_OUTPUT_TASKS:
+        return "" if os.path.exists(output_file) else None
+    digest = _file_digest(output_file)
+    return digest.hex() if digest is not None else None
+
+
+def _invoke_safely(callback: Callable, logger, success: bool, params: Dict[str, Any]):
+    """调用生成回调，异常只记录日志，不影响其他回调"""
+    try:
+        callback(success, params)
+    except Exception as e:
+        logger.error(f"生成回调函数执行失败: {e}")
+
+
+class GenerationCache:
+    """
+    生成结果缓存
+    以任务类型、影响输出的LLM参数、生成参数和输入文件内容作为键，记录已成功完成的生成
+    及当时的输出文件状态；再次以相同输入请求且输出文件未被修改时直接视为完成，
+    跳过重复的LLM调用。指定persist_path时缓存写入文件，重启应用后仍然有效
+    """
+    
+    def __init__(self, max_entries: int = 128, ttl: Optional[float] = None,
+                 persist_path: Optional[str] = None):
+        self._max_entries = max_entries
+        # 过期时间（秒），None表示不过期
+        self._ttl = ttl
+        self._persist_path = persist_path
+        # 缓存键 -> (完成时间（时间戳，可跨进程比较）, 生成后的输出文件状态)
+        self._entries: Dict[str, Tuple[float, Optional[str]]] = OrderedDict()
+        if persist_path:
+            self._load()
+    
+    @staticmethod
+    def llm_fingerprint(llm_config: Dict[str, Any]) -> str:
+        """计算LLM配置中影响输出的字段的指纹，内容相同的配置指纹相同"""
+        payload = _dumps_sorted([llm_config.get(key) for key in _CACHE_KEY_LLM_FIELDS])
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    @classmethod
+    def make_key(cls, task_type: str, llm_config: Dict[str, Any], params: Dict[str, Any],
+                 llm_fingerprint: Optional[str] = None, input_digests: Sequence[str] = ()) -> str:
+        """
+        计算缓存键，参数顺序与易变字段不影响结果
+        调用方已持有配置指纹时可通过llm_fingerprint传入，省去重复序列化；
+        input_digests为任务输入文件的内容摘要，输入文件变化后键随之变化
+        """
+        payload = _dumps_sorted({
+            "task": task_type,
+            "llm": llm_fingerprint or cls.llm_fingerprint(llm_config),
+            "params": {key: value for key, value in params.items() if key not in _VOLATILE_PARAM_KEYS},
+            "inputs": list(input_digests),
+        })
+        return hashlib.sha256(payload).hexdigest()
+    
+    def get(self, key: str, output_state: Optional[str] = None) -> bool:
+        """查询是否有有效的生成记录，记录了输出状态时当前输出须与之一致"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        finished_at, recorded_state = entry
+        if self._ttl is not None and time.time() - finished_at > self._ttl:
+            del self._entries[key]
+            return False
+        if recorded_state is not None and recorded_state != output_state:
+            return False
+        self._entries.move_to_end(key)
+        return True
+    
+    def update(self, key: str, output_state: Optional[str] = None):
+        """记录一次成功的生成及生成后的输出文件状态"""
+        self._entries[key] = (time.time(), output_state)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        if self._persist_path:
+            self._save()
+    
+    def clear(self):
+        """清空缓存"""
+        self._entries.clear()
+        if self._persist_path:
+            self._save()
+    
+    def _load(self):
+        """从缓存文件恢复记录，文件不存在或损坏时从空缓存开始"""
+        try:
+            with open(self._persist_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(entries, dict):
+            for key, entry in entries.items():
+                if isinstance(entry, list) and len(entry) == 2:
+                    self._entries[key] = (entry[0], entry[1])
+    
+    def _save(self):
+        """原子写入缓存文件"""
+        tmp_path = f"{self._persist_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self._persist_path)
+        except OSError:
+            pass
 
 
 class GenerationController(BaseController):
@@ -23,34 +255,38 @@ class GenerationController(BaseController):
         super().__init__("GenerationController")
         self._current_task = None
         self._task_progress = 0.0
-        self._generation_callbacks = {}
+        # 任务类型 -> 回调元组；注册和移除时整体替换，分发时直接遍历无需复制
+        self._generation_callbacks: Dict[str, tuple] = {}
+        # 批量生成中尚未完成的任务，取消时统一取消
+        self._batch_tasks: Set[asyncio.Task] = set()
+        # 当前单任务生成中正在等待的LLM调用，取消时直接取消以释放线程池槽位
+        self._active_future: Optional[asyncio.Future] = None
+        # LLM生成专用线程池，首次生成时创建
+        self._llm_pool: Optional[ThreadPoolExecutor] = None
+        # 可选的生成结果缓存，由外部注入
+        self._generation_cache: Optional[GenerationCache] = None
+        # 配置控制器及按任务类型缓存的LLM配置，配置变化事件到达时清空
+        self._config_controller = None
+        self._llm_config_cache: Dict[str, Dict[str, Any]] = {}
+        # 已缓存LLM配置的指纹，随配置缓存一同失效
+        self._llm_fingerprints: Dict[str, str] = {}
+        # View方法缓存，设置View时解析一次，避免每次调用hasattr
+        self._bind_view_methods(None)
         
         # 任务配置映射 - 消除特殊情况处理
-        self._task_configs = {
-            "architecture": {
-                "display_name": "小说架构",
-                "generator_func": self._execute_architecture_generation,
-                "validator_func": self._validate_architecture_params,
-                "async_runner": self._run_architecture_generation
-            },
-            "blueprint": {
-                "display_name": "章节蓝图", 
-                "generator_func": self._execute_blueprint_generation,
-                "validator_func": self._validate_blueprint_params,
-                "async_runner": self._run_blueprint_generation
-            },
-            "draft": {
-                "display_name": "章节草稿",
-                "generator_func": self._execute_draft_generation,
-                "validator_func": self._validate_draft_params,
-                "async_runner": self._run_draft_generation
-            },
-            "finalization": {
-                "display_name": "章节定稿",
-                "generator_func": self._execute_finalization,
-                "validator_func": self._validate_finalization_params,
-                "async_runner": self._run_finalization
-            }
+        self._task_configs: Dict[str, TaskConfig] = {
+            "architecture": TaskConfig(
+                "小说架构", self._execute_architecture_generation, _REQUIRED_PARAMS["architecture"]
+            ),
+            "blueprint": TaskConfig(
+                "章节蓝图", self._execute_blueprint_generation, _REQUIRED_PARAMS["blueprint"]
+            ),
+            "draft": TaskConfig(
+                "章节草稿", self._execute_draft_generation, _REQUIRED_PARAMS["draft"]
+            ),
+            "finalization": TaskConfig(
+                "章节定稿", self._execute_finalization, _REQUIRED_PARAMS["finalization"]
+            ),
         }
     
     async def initialize(self) -> bool:
@@ -59,6 +295,11 @@ class GenerationController(BaseController):
             if not self.validate_dependencies():
                 return False
             
+            # 仅在事件循环尚未设置任务工厂时启用，不覆盖应用自己的设置
+            loop = asyncio.get_running_loop()
+            if _EAGER_TASK_FACTORY is not None and loop.get_task_factory() is None:
+                loop.set_task_factory(_EAGER_TASK_FACTORY)
+            
             self.set_state(ControllerState.IDLE)
             return True
             
@@ -66,11 +307,56 @@ class GenerationController(BaseController):
             self._handle_error(e, "生成控制器初始化")
             return False
     
+    def on_view_set(self, view):
+        """View设置完成后缓存其可选方法"""
+        self._bind_view_methods(view)
+    
+    def _bind_view_methods(self, view):
+        """解析View的可选方法，不存在时为None"""
+        self._view_show_success = getattr(view, 'show_success', None)
+        self._view_show_error = getattr(view, 'show_error', None)
+        self._view_set_generation_status = getattr(view, 'set_generation_status', None)
+        self._view_get_current_llm_config = getattr(view, 'get_current_llm_config', None)
+    
+    @property
+    def config_controller(self):
+        """提供LLM配置的配置控制器"""
+        return self._config_controller
+    
+    @config_controller.setter
+    def config_controller(self, controller):
+        """设置配置控制器，并订阅其配置变化事件以使缓存失效"""
+        previous = self._config_controller
+        if previous is not None:
+            for event_type in _CONFIG_CHANGE_EVENTS:
+                previous.remove_event_listener(event_type, self._on_config_changed)
+        self._config_controller = controller
+        self._llm_config_cache.clear()
+        self._llm_fingerprints.clear()
+        if controller is not None:
+            for event_type in _CONFIG_CHANGE_EVENTS:
+                controller.add_event_listener(event_type, self._on_config_changed)
+    
+    def _on_config_changed(self, event):
+        """配置变化时清空任务LLM配置缓存"""
+        self._llm_config_cache.clear()
+        self._llm_fingerprints.clear()
+    
+    def set_generation_cache(self, cache: Optional[GenerationCache]):
+        """
+        设置生成结果缓存（默认不启用），传入None关闭缓存
+        启用后输入未变化的重复生成会直接返回，需要重新生成时在参数中传入force_regenerate=True
+        """
+        self._generation_cache = cache
+    
     async def cleanup(self):
         """清理资源"""
         if self._current_task:
             self._current_task = None
         self._generation_callbacks.clear()
+        if self._llm_pool is not None:
+            self._llm_pool.shutdown(wait=False, cancel_futures=True)
+            self._llm_pool = None
         self.logger.info("生成控制器已清理")
     
     # ========== 统一的生成任务模板方法 ==========
@@ -81,7 +367,7 @@ class GenerationController(BaseController):
         消除了四个函数中的重复逻辑
         """
         task_config = self._task_configs.get(task_type)
-        if not task_config:
+        if task_config is None:
             self._handle_unknown_task_type(task_type)
             return False
         
@@ -90,31 +376,50 @@ class GenerationController(BaseController):
             self._current_task = f"{task_type}_generation"
             
             # 统一参数验证
-            if not task_config["validator_func"](params):
+            if not self._validate_params(task_type, params):
                 self.set_state(ControllerState.ERROR)
                 return False
             
             # 统一配置获取
             llm_config = self._get_llm_config_for_task(task_type)
             if not llm_config:
-                self._handle_config_error(task_type, task_config["display_name"])
+                self._handle_config_error(task_type, task_config.display_name)
                 return False
             
+            # 相同参数已成功生成过时直接返回
+            cache_key = self._generation_cache_key(task_type, llm_config, params)
+            if self._generation_cache_hit(task_type, params, cache_key):
+                self.logger.info("命中生成缓存，跳过%s生成", task_config.display_name)
+                return self._handle_generation_result(task_type, task_config, True, params)
+            
             # 统一UI状态更新
-            self._update_generation_status(f"正在生成{task_config['display_name']}...")
+            self._update_generation_status(task_config.status_msg)
             
             # 发出开始事件
             self._emit_start_event(task_type, params)
             
             # 执行具体生成逻辑
-            success = await task_config["async_runner"](llm_config, params)
+            active = self._active_future = asyncio.ensure_future(
+                self._run_llm(task_config.generator_func, llm_config, params)
+            )
+            try:
+                success = await active
+            except asyncio.CancelledError:
+                # cancel_current_task取消时会先清除引用；引用仍在说明是外层任务被取消
+                if self._active_future is active:
+                    raise
+                self.logger.info("%s生成已取消", task_config.display_name)
+                return False
+            if success:
+                self._record_generation(task_type, params, cache_key)
             
             # 统一结果处理
-            return self._handle_generation_result(task_type, task_config["display_name"], success, params)
+            return self._handle_generation_result(task_type, task_config, success, params)
             
         except Exception as e:
-            return self._handle_generation_error(task_type, task_config["display_name"], e, params)
+            return self._handle_generation_error(task_type, task_config.display_name, e, params)
         finally:
+            self._active_future = None
             self._cleanup_generation_task()
     
     # ========== 公共接口方法 ==========
@@ -135,6 +440,117 @@ class GenerationController(BaseController):
         """完成章节定稿"""
         return await self._execute_generation_task("finalization", params)
     
+    async def generate_chapter_drafts_batch(self, params_list: List[Dict[str, Any]],
+                                            max_concurrency: Optional[int] = None) -> List[bool]:
+        """
+        批量生成章节草稿
+        草稿生成依赖同一项目中前面章节的内容，因此同一项目内按章节顺序依次生成，
+        前一章失败时后续章节不再生成；不同项目之间并发执行，并发数受max_concurrency
+        （或LLM配置的max_parallel）限制。返回与params_list一一对应的结果
+        """
+        if not params_list:
+            return []
+        
+        task_config = self._task_configs["draft"]
+        display_name = task_config.display_name
+        llm_config = self._get_llm_config_for_task("draft")
+        if not llm_config:
+            self._handle_config_error("draft", display_name)
+            return [False] * len(params_list)
+        
+        generator = task_config.generator_func
+        semaphore = asyncio.Semaphore(
+            max_concurrency or llm_config.get("max_parallel", _DEFAULT_BATCH_CONCURRENCY)
+        )
+        
+        async def run_one(params: Dict[str, Any]) -> bool:
+            if not self._validate_params("draft", params):
+                return False
+            cache_key = self._generation_cache_key("draft", llm_config, params)
+            if self._generation_cache_hit("draft", params, cache_key):
+                return True
+            async with semaphore:
+                self._emit_start_event("draft", params)
+                success = await self._run_llm(generator, llm_config, params)
+            if success:
+                self._record_generation("draft", params, cache_key)
+            return success
+        
+        self.set_state(ControllerState.PROCESSING)
+        self._current_task = "draft_batch_generation"
+        self._update_generation_status(f"**正在批量生成{len(params_list)}章{display_name}...**")
+        
+        total = len(params_list)
+        finished = 0
+        # 未执行（被取消或前一章失败）的章节保持False
+        outcomes: List[Any] = [False] * total
+        
+        def on_chapter_done():
+            # 每处理完一章更新一次进度
+            nonlocal finished
+            finished += 1
+            self._update_progress("draft", finished / total, completed=finished, total=total)
+        
+        async def run_project(indexes: List[int]):
+            for position, index in enumerate(indexes):
+                try:
+                    outcomes[index] = await run_one(params_list[index])
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    outcomes[index] = e
+                if isinstance(outcomes[index], Exception) or not outcomes[index]:
+                    # 后续章节缺少前文，不再生成
+                    for _ in indexes[position:]:
+                        on_chapter_done()
+                    return
+                on_chapter_done()
+        
+        projects: Dict[str, List[int]] = {}
+        for index, params in enumerate(params_list):
+            projects.setdefault(params.get('filepath', ''), []).append(index)
+        tasks = [
+            asyncio.ensure_future(run_project(sorted(indexes, key=lambda i: _chapter_order(params_list[i]))))
+            for indexes in projects.values()
+        ]
+        self._batch_tasks.update(tasks)
+        try:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self._batch_tasks.difference_update(tasks)
+            self._cleanup_generation_task()
+        
+        # 各章节的完成事件缓存后统一分发
+        results = []
+        with self.batch_events():
+            for params, outcome in zip(params_list, outcomes):
+                if isinstance(outcome, BaseException):
+                    if not isinstance(outcome, asyncio.CancelledError):
+                        self.logger.error("%s批量生成异常: %s", display_name, outcome)
+                    outcome = False
+                self._emit(
+                    "draft_generation_completed" if outcome else "draft_generation_failed",
+                    {"success": outcome, "params": params}
+                )
+                self._call_generation_callbacks("draft", outcome, params)
+                results.append(outcome)
+        
+        succeeded = sum(results)
+        if succeeded == len(results):
+            if self._view_show_success:
+                self._view_show_success(f"**{succeeded}章{display_name}生成完成**")
+            self.set_state(ControllerState.IDLE)
+        else:
+            if self._view_show_error:
+                self._view_show_error(f"**{display_name}批量生成：{len(results) - succeeded}章失败**")
+            self.set_state(ControllerState.ERROR)
+        return results
+    
+    def _update_progress(self, task_type: str, progress: float, **data):
+        """更新任务进度并发出进度事件"""
+        self._task_progress = progress
+        self._emit(f"{task_type}_generation_progress", dict(data, progress=progress))
+    
     # ========== 任务管理方法 ==========
     
     def get_current_task(self) -> Optional[str]:
@@ -146,7 +562,12 @@ class GenerationController(BaseController):
         return self._task_progress
     
     def cancel_current_task(self):
-        """取消当前任务"""
+        """取消当前任务，尚未开始的LLM调用不再执行"""
+        for task in self._batch_tasks:
+            task.cancel()
+        active, self._active_future = self._active_future, None
+        if active is not None and not active.done():
+            active.cancel()
         if self._current_task:
             self.logger.info(f"取消任务: {self._current_task}")
             self._current_task = None
@@ -156,18 +577,22 @@ class GenerationController(BaseController):
     # ========== 回调管理 ==========
     
     def add_generation_callback(self, task_type: str, callback: Callable):
-        """添加生成任务回调"""
-        if task_type not in self._generation_callbacks:
-            self._generation_callbacks[task_type] = []
-        self._generation_callbacks[task_type].append(callback)
+        """添加生成任务回调（注册时包装异常处理，分发时无需逐个设置）"""
+        self._generation_callbacks[task_type] = self._generation_callbacks.get(task_type, ()) + (
+            functools.partial(_invoke_safely, callback, self.logger),
+        )
     
     def remove_generation_callback(self, task_type: str, callback: Callable):
         """移除生成任务回调"""
-        if task_type in self._generation_callbacks:
-            try:
-                self._generation_callbacks[task_type].remove(callback)
-            except ValueError:
-                pass
+        callbacks = self._generation_callbacks.get(task_type, ())
+        for index, wrapped in enumerate(callbacks):
+            if wrapped.args[0] == callback:
+                remaining = callbacks[:index] + callbacks[index + 1:]
+                if remaining:
+                    self._generation_callbacks[task_type] = remaining
+                else:
+                    del self._generation_callbacks[task_type]
+                return
     
     # ========== 私有辅助方法 ==========
     
@@ -175,83 +600,64 @@ class GenerationController(BaseController):
         """处理未知任务类型"""
         error_msg = f"未知的生成任务类型: {task_type}"
         self.logger.error(error_msg)
-        if hasattr(self.view, 'show_error'):
-            self.view.show_error(f"**{error_msg}**")
+        if self._view_show_error:
+            self._view_show_error(f"**{error_msg}**")
         self.set_state(ControllerState.ERROR)
     
     def _handle_config_error(self, task_type: str, display_name: str):
         """处理配置错误"""
         error_msg = f"未找到{display_name}的LLM配置"
         self.logger.error(error_msg)
-        if hasattr(self.view, 'show_error'):
-            self.view.show_error(f"**{error_msg}**")
+        if self._view_show_error:
+            self._view_show_error(f"**{error_msg}**")
         self.set_state(ControllerState.ERROR)
     
     def _update_generation_status(self, status: str):
-        """更新生成状态"""
-        if hasattr(self.view, 'set_generation_status'):
-            self.view.set_generation_status(f"**{status}**")
+        """更新生成状态（status为已格式化的显示文本）"""
+        if self._view_set_generation_status:
+            self._view_set_generation_status(status)
     
     def _emit_start_event(self, task_type: str, params: Dict[str, Any]):
         """发出开始事件"""
-        start_event = ControllerEvent(
-            event_type=f"{task_type}_generation_started",
-            source=self.name,
-            data=params
-        )
-        self.emit_event(start_event)
-    
-    def _handle_generation_result(self, task_type: str, display_name: str, success: bool, params: Dict[str, Any]) -> bool:
-        """处理生成结果"""
-        if success:
-            if hasattr(self.view, 'show_success'):
-                self.view.show_success(f"**{display_name}生成完成**")
-            
-            # 发出完成事件
-            complete_event = ControllerEvent(
-                event_type=f"{task_type}_generation_completed",
-                source=self.name,
-                data={"success": True, "params": params}
-            )
-            self.emit_event(complete_event)
-            
-            # 调用回调函数
-            self._call_generation_callbacks(task_type, True, params)
-            self.set_state(ControllerState.IDLE)
-            return True
-        else:
-            if hasattr(self.view, 'show_error'):
-                self.view.show_error(f"**{display_name}生成失败**")
-            
-            # 发出失败事件
-            error_event = ControllerEvent(
-                event_type=f"{task_type}_generation_failed",
-                source=self.name,
-                data={"success": False, "params": params}
-            )
-            self.emit_event(error_event)
-            
-            # 调用回调函数
-            self._call_generation_callbacks(task_type, False, params)
-            self.set_state(ControllerState.ERROR)
-            return False
+        self._emit(f"{task_type}_generation_started", params)
+    
+    def _handle_generation_result(self, task_type: str, task_config: TaskConfig, success: bool, params: Dict[str, Any]) -> bool:
+        """处理生成结果（完成事件与状态变化事件一并分发）"""
+        with self.batch_events():
+            if success:
+                if self._view_show_success:
+                    self._view_show_success(task_config.success_msg)
+                
+                # 发出完成事件
+                self._emit(f"{task_type}_generation_completed", {"success": True, "params": params})
+                
+                # 调用回调函数
+                self._call_generation_callbacks(task_type, True, params)
+                self.set_state(ControllerState.IDLE)
+                return True
+            else:
+                if self._view_show_error:
+                    self._view_show_error(task_config.fail_msg)
+                
+                # 发出失败事件
+                self._emit(f"{task_type}_generation_failed", {"success": False, "params": params})
+                
+                # 调用回调函数
+                self._call_generation_callbacks(task_type, False, params)
+                self.set_state(ControllerState.ERROR)
+                return False
     
     def _handle_generation_error(self, task_type: str, display_name: str, error: Exception, params: Dict[str, Any]) -> bool:
         """处理生成异常"""
         error_msg = f"{display_name}生成异常: {str(error)}"
         self.logger.error(error_msg)
-        if hasattr(self.view, 'show_error'):
-            self.view.show_error(f"**{error_msg}**")
+        if self._view_show_error:
+            self._view_show_error(f"**{error_msg}**")
         
-        # 发出异常事件
-        exception_event = ControllerEvent(
-            event_type=f"{task_type}_generation_exception",
-            source=self.name,
-            data={"error": str(error), "params": params}
-        )
-        self.emit_event(exception_event)
-        
-        self.set_state(ControllerState.ERROR)
+        # 异常事件与状态变化事件一并分发
+        with self.batch_events():
+            self._emit(f"{task_type}_generation_exception", {"error": str(error), "params": params})
+            self.set_state(ControllerState.ERROR)
         return False
     
     def _cleanup_generation_task(self):
@@ -261,18 +667,16 @@ class GenerationController(BaseController):
     
     # ========== 具体生成逻辑执行器 ==========
     
-    async def _run_architecture_generation(self, llm_config: Dict[str, Any], params: Dict[str, Any]) -> bool:
-        """异步执行架构生成"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, 
-            self._execute_architecture_generation, 
-            llm_config, 
-            params
-        )
+    async def _run_llm(self, func: Callable, *args):
+        """在LLM生成专用线程池中执行阻塞的生成调用"""
+        if self._llm_pool is None:
+            self._llm_pool = ThreadPoolExecutor(max_workers=_LLM_WORKERS, thread_name_prefix="llm-gen")
+        return await run_blocking(func, *args, executor=self._llm_pool)
     
     def _execute_architecture_generation(self, llm_config: Dict[str, Any], params: Dict[str, Any]) -> bool:
         """执行架构生成"""
+        # 生成模块依赖LLM与向量库SDK，首次执行对应任务时才导入
+        from novel_generator.architecture import Novel_architecture_generate
         try:
             result = Novel_architecture_generate(
                 topic=params.get('topic', ''),
@@ -287,18 +691,9 @@ class GenerationController(BaseController):
             self.logger.error(f"架构生成执行失败: {e}")
             return False
     
-    async def _run_blueprint_generation(self, llm_config: Dict[str, Any], params: Dict[str, Any]) -> bool:
-        """异步执行蓝图生成"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, 
-            self._execute_blueprint_generation, 
-            llm_config, 
-            params
-        )
-    
     def _execute_blueprint_generation(self, llm_config: Dict[str, Any], params: Dict[str, Any]) -> bool:
         """执行蓝图生成"""
+        from novel_generator.blueprint import Chapter_blueprint_generate
         try:
             result = Chapter_blueprint_generate(
                 filepath=params.get('filepath', ''),
@@ -309,18 +704,9 @@ class GenerationController(BaseController):
             self.logger.error(f"蓝图生成执行失败: {e}")
             return False
     
-    async def _run_draft_generation(self, llm_config: Dict[str, Any], params: Dict[str, Any]) -> bool:
-        """异步执行草稿生成"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, 
-            self._execute_draft_generation, 
-            llm_config, 
-            params
-        )
-    
     def _execute_draft_generation(self, llm_config: Dict[str, Any], params: Dict[str, Any]) -> bool:
         """执行草稿生成"""
+        from novel_generator.chapter import generate_chapter_draft
         try:
             result = generate_chapter_draft(
                 filepath=params.get('filepath', ''),
@@ -338,18 +724,9 @@ class GenerationController(BaseController):
             self.logger.error(f"草稿生成执行失败: {e}")
             return False
     
-    async def _run_finalization(self, llm_config: Dict[str, Any], params: Dict[str, Any]) -> bool:
-        """异步执行定稿"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None, 
-            self._execute_finalization, 
-            llm_config, 
-            params
-        )
-    
     def _execute_finalization(self, llm_config: Dict[str, Any], params: Dict[str, Any]) -> bool:
-        """执行定稿"""
+        """执行章节定稿"""
+        from novel_generator.finalization import finalize_chapter
         try:
             result = finalize_chapter(
                 filepath=params.get('filepath', ''),
@@ -366,10 +743,16 @@ class GenerationController(BaseController):
     def _get_llm_config_for_task(self, task_type: str) -> Optional[Dict[str, Any]]:
         """获取任务对应的LLM配置"""
         try:
-            if hasattr(self, 'config_controller') and self.config_controller:
-                return self.config_controller.get_current_llm_config()
-            elif hasattr(self.view, 'get_current_llm_config'):
-                return self.view.get_current_llm_config()
+            if self._config_controller is not None:
+                # 来自配置控制器的结果可缓存，配置变化事件会清空缓存
+                config = self._llm_config_cache.get(task_type)
+                if config is None:
+                    config = self._config_controller.get_current_llm_config()
+                    if config:
+                        self._llm_config_cache[task_type] = config
+                return config
+            elif self._view_get_current_llm_config:
+                return self._view_get_current_llm_config()
             else:
                 self.logger.warning("无法获取LLM配置")
                 return None
@@ -377,30 +760,47 @@ class GenerationController(BaseController):
             self.logger.error(f"获取LLM配置失败: {e}")
             return None
     
-    def _validate_architecture_params(self, params: Dict[str, Any]) -> bool:
-        """验证架构生成参数"""
-        required_fields = ['topic', 'genre', 'num_chapters', 'word_number', 'filepath']
-        return all(params.get(field) for field in required_fields)
-    
-    def _validate_blueprint_params(self, params: Dict[str, Any]) -> bool:
-        """验证蓝图生成参数"""
-        return bool(params.get('filepath'))
-    
-    def _validate_draft_params(self, params: Dict[str, Any]) -> bool:
-        """验证草稿生成参数"""
-        required_fields = ['filepath', 'chapter_num']
-        return all(params.get(field) for field in required_fields)
+    def _generation_cache_key(self, task_type: str, llm_config: Dict[str, Any],
+                              params: Dict[str, Any]) -> Optional[str]:
+        """计算生成缓存键（包含输入文件的内容摘要），未启用缓存时返回None"""
+        if self._generation_cache is None:
+            return None
+        input_files, _ = _generation_files(task_type, params)
+        input_digests = [(_file_digest(path) or b"").hex() for path in input_files]
+        return self._generation_cache.make_key(
+            task_type, llm_config, params, self._llm_fingerprint_for_task(task_type, llm_config),
+            input_digests
+        )
     
-    def _validate_finalization_params(self, params: Dict[str, Any]) -> bool:
-        """验证定稿参数"""
-        required_fields = ['filepath', 'chapter_num']
-        return all(params.get(field) for field in required_fields)
+    def _generation_cache_hit(self, task_type: str, params: Dict[str, Any], cache_key: Optional[str]) -> bool:
+        """
+        查询生成缓存，输出文件已不存在或生成后被修改时视为未命中
+        参数中force_regenerate为真时跳过缓存，强制重新生成
+        """
+        if cache_key is None or params.get("force_regenerate"):
+            return False
+        output_state = _output_state(task_type, params)
+        return output_state is not None and self._generation_cache.get(cache_key, output_state)
+    
+    def _record_generation(self, task_type: str, params: Dict[str, Any], cache_key: Optional[str]):
+        """生成成功后记录缓存及当前输出文件状态"""
+        if cache_key is not None:
+            self._generation_cache.update(cache_key, _output_state(task_type, params))
+    
+    def _llm_fingerprint_for_task(self, task_type: str, llm_config: Dict[str, Any]) -> str:
+        """获取LLM配置指纹，配置来自缓存时只计算一次"""
+        if self._llm_config_cache.get(task_type) is not llm_config:
+            return GenerationCache.llm_fingerprint(llm_config)
+        fingerprint = self._llm_fingerprints.get(task_type)
+        if fingerprint is None:
+            fingerprint = self._llm_fingerprints[task_type] = GenerationCache.llm_fingerprint(llm_config)
+        return fingerprint
+    
+    def _validate_params(self, task_type: str, params: Dict[str, Any]) -> bool:
+        """验证生成参数，任务配置中的必填字段均不能为空"""
+        return all(map(params.get, self._task_configs[task_type].required_fields))
     
     def _call_generation_callbacks(self, task_type: str, success: bool, params: Dict[str, Any]):
         """调用生成回调函数"""
-        if task_type in self._generation_callbacks:
-            for callback in self._generation_callbacks[task_type]:
-                try:
-                    callback(success, params)
-                except Exception as e:
-                    self.logger.error(f"生成回调函数执行失败: {e}")
\ No newline at end of file
+        for callback in self._generation_callbacks.get(task_type, ()):
+            callback(success, params)
\ No newline at end of file
@@ -4,9 +4,145 @@
 """
 import os
 import json
-from typing import Dict, Any, Optional, List
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Callable, List, Mapping, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
-from .base_controller import BaseController, ControllerState, ControllerEvent
+from .base_controller import BaseController, ControllerState, run_blocking
+from ..config_models import DATACLASS_OPTIONS
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+
+@dataclass(**DATACLASS_OPTIONS)
+class ProjectViewUpdate:
+    """
+    一次项目操作对View的全部更新
+    View实现apply_project_updates时整批交给View，由其合并重绘；否则逐项调用对应方法
+    """
+    project_info: Optional[Dict[str, Any]] = None
+    project_files_path: Optional[str] = None
+    clear_project_info: bool = False
+    success_message: Optional[str] = None
+
+
+def _now_iso() -> str:
+    """当前本地时间的ISO格式字符串"""
+    return datetime.now().isoformat()
+
+
+# 项目目录下的配置文件名
+_PROJECT_CONFIG_FILENAME = "project_config.json"
+
+# 项目配置修改后延迟保存的合并窗口（秒）
+_AUTO_SAVE_DEBOUNCE_DELAY = 1.0
+
+# 项目配置解析缓存的最大条目数，超出时淘汰最久未使用的项目
+_PROJECT_CONFIG_CACHE_SIZE = 16
+
+# 创建项目的必填字段，值为空同样视为缺失
+_PROJECT_REQUIRED_FIELDS = ("project_name", "topic", "genre", "num_chapters", "word_number", "filepath")
+
+# 项目历史最多保留的条数
+_MAX_PROJECT_HISTORY = 10
+
+# 项目文件列表中显示的文件类型
+_PROJECT_FILE_SUFFIXES = frozenset(('.txt', '.md', '.json'))
+
+
+# 目录修改时间距今不足该值（纳秒）时不缓存其列表：文件系统时间戳精度有限，
+# 同一时间片内的后续改动不会改变目录修改时间
+_LISTING_RACY_WINDOW_NS = 1_000_000_000
+
+
+def _scan_directory(directory: str) -> Tuple[List[str], List[str]]:
+    """列出目录中的子目录与指定类型文件（均为完整路径），直接使用目录项自带的类型信息"""
+    subdirs, files = [], []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif os.path.splitext(entry.name)[1] in _PROJECT_FILE_SUFFIXES:
+                files.append(entry.path)
+    return subdirs, files
+
+
+def _iter_project_files(root: str, listing_cache: Optional[Dict[str, Tuple[int, List[str], List[str]]]] = None):
+    """
+    遍历目录树，产出指定类型文件相对root的路径
+    传入listing_cache时按目录修改时间复用上次的目录列表，目录内增删文件会改变其修改时间
+    """
+    prefix_len = len(root.rstrip(os.sep) + os.sep)
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            if listing_cache is None:
+                subdirs, files = _scan_directory(directory)
+            else:
+                mtime = os.stat(directory).st_mtime_ns
+                cached = listing_cache.get(directory)
+                if cached is not None and cached[0] == mtime:
+                    _, subdirs, files = cached
+                else:
+                    subdirs, files = _scan_directory(directory)
+                    if time.time_ns() - mtime > _LISTING_RACY_WINDOW_NS:
+                        listing_cache[directory] = (mtime, subdirs, files)
+                    else:
+                        listing_cache.pop(directory, None)
+        except OSError:
+            # 与os.walk一致，跳过无法读取的目录
+            continue
+        stack.extend(subdirs)
+        for path in files:
+            yield path[prefix_len:]
+
+
+def _json_dumps_bytes(data: Any) -> bytes:
+    """
+    序列化为带缩进的UTF-8字节，orjson可用时优先使用
+    OPT_INDENT_2输出与json.dumps(indent=2, ensure_ascii=False)相同的格式，项目文件格式不变
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # 含orjson不支持的类型时退回标准库
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _atomic_write_bytes(path: str, payload: bytes):
+    """先写临时文件并落盘，再原子替换目标文件，写入中断不会留下截断的文件"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _json_loads_bytes(payload: bytes) -> Any:
+    """解析JSON字节，orjson可用时优先使用"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(payload)
+    return json.loads(payload)
 
 
 class NovelController(BaseController):
@@ -15,12 +151,43 @@ class NovelController(BaseController):
     处理小说项目的创建、加载、保存等操作
     """
     
+    # 项目子目录
+    _SUBDIRS = (
+        "architecture",      # 架构文件
+        "blueprints",       # 章节蓝图
+        "drafts",          # 章节草稿
+        "final_chapters",  # 最终章节
+        "characters",      # 角色信息
+        "settings",        # 设定信息
+        "resources"        # 资源文件
+    )
+    
     def __init__(self):
         super().__init__("NovelController")
         self._current_project = None
-        self._project_history = []
+        # 项目路径 -> 历史记录，最近打开的在前
+        self._project_history: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # 项目历史的只读快照，历史变化时置空，下次读取时重建
+        self._history_snapshot: Optional[Tuple[Mapping[str, Any], ...]] = None
+        # 应用数据目录与项目历史文件路径，创建时解析一次
+        self._app_dir = os.path.join(os.path.expanduser("~"), ".novel_generator")
+        self._history_path = os.path.join(self._app_dir, "project_history.json")
+        # 项目文件读写专用线程池，首次使用时创建
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        # View方法缓存，设置View时解析一次，避免每次调用hasattr
+        self._bind_view_methods(None)
         self._auto_save_enabled = True
         self._auto_save_interval = 300  # 5分钟
+        # 项目配置是否有尚未写盘的修改，及合并这些修改的自动保存定时器
+        self._project_dirty = False
+        self._pending_save: Optional[threading.Timer] = None
+        # _save_lock保护修改标记与定时器，_write_lock串行化同一配置文件的写入
+        self._save_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # 项目配置文件路径 -> ((修改时间, 文件大小), 解析结果)，文件未变化时免去重复读取解析；按LRU限制条目数
+        self._project_config_cache: "OrderedDict[str, Tuple[Tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+        # 项目目录列表缓存：目录路径 -> (修改时间, 子目录, 文件)，关闭项目时清空
+        self._listing_cache: Dict[str, Tuple[int, List[str], List[str]]] = {}
     
     async def initialize(self) -> bool:
         """初始化小说控制器"""
@@ -28,8 +195,8 @@ class NovelController(BaseController):
             if not self.validate_dependencies():
                 return False
             
-            # 加载项目历史
-            self._load_project_history()
+            # 加载项目历史（文件读写在线程池中执行，不阻塞事件循环）
+            await self._run_io(self._load_project_history)
             
             self.set_state(ControllerState.IDLE)
             return True
@@ -38,17 +205,43 @@ class NovelController(BaseController):
             self._handle_error(e, "小说控制器初始化")
             return False
     
+    def on_view_set(self, view):
+        """View设置完成后缓存其可选方法"""
+        self._bind_view_methods(view)
+    
+    def _bind_view_methods(self, view):
+        """解析View的可选方法，不存在时为None"""
+        self._view_show_success = getattr(view, 'show_success', None)
+        self._view_show_error = getattr(view, 'show_error', None)
+        self._view_update_project_info = getattr(view, 'update_project_info', None)
+        self._view_load_project_files = getattr(view, 'load_project_files', None)
+        self._view_clear_project_info = getattr(view, 'clear_project_info', None)
+        self._view_apply_project_updates = getattr(view, 'apply_project_updates', None)
+    
     async def cleanup(self):
         """清理资源"""
+        # 下面会直接保存，不再等待自动保存
+        self._cancel_pending_save()
+        
         # 保存当前项目
         if self._current_project:
             await self.save_current_project()
         
         # 保存项目历史
-        self._save_project_history()
+        await self._run_io(self._save_project_history)
+        
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=False)
+            self._io_pool = None
         
         self.logger.info("小说控制器已清理")
     
+    async def _run_io(self, func: Callable, *args, **kwargs):
+        """在项目文件专用线程池中执行阻塞调用"""
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="novel-io")
+        return await run_blocking(func, *args, executor=self._io_pool, **kwargs)
+    
     async def create_new_project(self, project_data: Dict[str, Any]) -> bool:
         """创建新的小说项目"""
         try:
@@ -61,13 +254,14 @@ class NovelController(BaseController):
             
             # 创建项目目录结构
             project_path = project_data["filepath"]
-            if not self._create_project_structure(project_path):
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error("**项目目录创建失败**")
+            if not await self._run_io(self._create_project_structure, project_path):
+                if self._view_show_error:
+                    self._view_show_error("**项目目录创建失败**")
                 self.set_state(ControllerState.ERROR)
                 return False
             
-            # 创建项目配置文件
+            # 创建项目配置文件（创建与修改时间取同一时刻）
+            now_iso = _now_iso()
             project_config = {
                 "project_name": project_data["project_name"],
                 "topic": project_data["topic"],
@@ -75,16 +269,16 @@ class NovelController(BaseController):
                 "num_chapters": project_data["num_chapters"],
                 "word_number": project_data["word_number"],
                 "user_guidance": project_data.get("user_guidance", ""),
-                "created_time": datetime.now().isoformat(),
-                "last_modified": datetime.now().isoformat(),
+                "created_time": now_iso,
+                "last_modified": now_iso,
                 "version": "1.0",
                 "status": "created"
             }
             
-            config_path = os.path.join(project_path, "project_config.json")
-            if not self._save_project_config(config_path, project_config):
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error("**项目配置保存失败**")
+            config_path = os.path.join(project_path, _PROJECT_CONFIG_FILENAME)
+            if not await self._run_io(self._save_project_config, config_path, project_config):
+                if self._view_show_error:
+                    self._view_show_error("**项目配置保存失败**")
                 self.set_state(ControllerState.ERROR)
                 return False
             
@@ -98,19 +292,13 @@ class NovelController(BaseController):
             self._add_to_project_history(project_path, project_config["project_name"])
             
             # 更新UI
-            if hasattr(self.view, 'update_project_info'):
-                self.view.update_project_info(project_config)
-            
-            if hasattr(self.view, 'show_success'):
-                self.view.show_success(f"**项目 '{project_config['project_name']}' 创建成功**")
+            self._apply_view_update(ProjectViewUpdate(
+                project_info=project_config,
+                success_message=f"**项目 '{project_config['project_name']}' 创建成功**"
+            ))
             
             # 发出项目创建事件
-            event = ControllerEvent(
-                event_type="project_created",
-                source=self.name,
-                data={"project_path": project_path, "config": project_config}
-            )
-            self.emit_event(event)
+            self._emit("project_created", {"project_path": project_path, "config": project_config})
             
             self.set_state(ControllerState.COMPLETED)
             return True
@@ -124,20 +312,17 @@ class NovelController(BaseController):
         try:
             self.set_state(ControllerState.PROCESSING)
             
-            # 验证项目路径
-            if not os.path.exists(project_path):
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error("**项目路径不存在**")
-                self.set_state(ControllerState.ERROR)
-                return False
-            
-            # 加载项目配置
-            config_path = os.path.join(project_path, "project_config.json")
-            project_config = self._load_project_config(config_path)
+            # 加载项目配置，配置文件不存在时同样返回None
+            config_path = os.path.join(project_path, _PROJECT_CONFIG_FILENAME)
+            project_config = await self._run_io(self._load_project_config, config_path)
             
             if not project_config:
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error("**项目配置文件无效**")
+                # 仅在失败时区分是项目路径不存在还是配置无效
+                if self._view_show_error:
+                    if os.path.exists(project_path):
+                        self._view_show_error("**项目配置文件无效**")
+                    else:
+                        self._view_show_error("**项目路径不存在**")
                 self.set_state(ControllerState.ERROR)
                 return False
             
@@ -155,22 +340,14 @@ class NovelController(BaseController):
             self._add_to_project_history(project_path, project_config.get("project_name", "未命名项目"))
             
             # 更新UI
-            if hasattr(self.view, 'update_project_info'):
-                self.view.update_project_info(project_config)
-            
-            if hasattr(self.view, 'load_project_files'):
-                self.view.load_project_files(project_path)
-            
-            if hasattr(self.view, 'show_success'):
-                self.view.show_success(f"**项目 '{project_config.get('project_name', '未命名')}' 加载成功**")
+            self._apply_view_update(ProjectViewUpdate(
+                project_info=project_config,
+                project_files_path=project_path,
+                success_message=f"**项目 '{project_config.get('project_name', '未命名')}' 加载成功**"
+            ))
             
             # 发出项目加载事件
-            event = ControllerEvent(
-                event_type="project_loaded",
-                source=self.name,
-                data={"project_path": project_path, "config": project_config}
-            )
-            self.emit_event(event)
+            self._emit("project_loaded", {"project_path": project_path, "config": project_config})
             
             self.set_state(ControllerState.COMPLETED)
             return True
@@ -186,31 +363,29 @@ class NovelController(BaseController):
                 return True
             
             self.set_state(ControllerState.PROCESSING)
+            # 写盘期间的新修改会重新标记
+            self._project_dirty = False
             
             # 更新最后修改时间
-            self._current_project["config"]["last_modified"] = datetime.now().isoformat()
+            self._current_project["config"]["last_modified"] = _now_iso()
             
             # 保存项目配置
-            config_path = os.path.join(self._current_project["path"], "project_config.json")
-            success = self._save_project_config(config_path, self._current_project["config"])
+            config_path = os.path.join(self._current_project["path"], _PROJECT_CONFIG_FILENAME)
+            # 传入副本，避免写入期间配置在事件循环线程中被修改
+            success = await self._run_io(self._save_project_config, config_path, dict(self._current_project["config"]))
             
             if success:
-                if hasattr(self.view, 'show_success'):
-                    self.view.show_success("**项目保存成功**")
+                if self._view_show_success:
+                    self._view_show_success("**项目保存成功**")
                 
                 # 发出项目保存事件
-                event = ControllerEvent(
-                    event_type="project_saved",
-                    source=self.name,
-                    data={"project_path": self._current_project["path"]}
-                )
-                self.emit_event(event)
+                self._emit("project_saved", {"project_path": self._current_project["path"]})
                 
                 self.set_state(ControllerState.COMPLETED)
                 return True
             else:
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error("**项目保存失败**")
+                if self._view_show_error:
+                    self._view_show_error("**项目保存失败**")
                 self.set_state(ControllerState.ERROR)
                 return False
                 
@@ -225,26 +400,22 @@ class NovelController(BaseController):
                 return True
             
             # 保存当前项目
+            self._cancel_pending_save()
             await self.save_current_project()
             
             # 清除当前项目
             project_name = self._current_project["config"].get("project_name", "未命名")
             self._current_project = None
+            self._listing_cache.clear()
             
             # 更新UI
-            if hasattr(self.view, 'clear_project_info'):
-                self.view.clear_project_info()
-            
-            if hasattr(self.view, 'show_success'):
-                self.view.show_success(f"**项目 '{project_name}' 已关闭**")
+            self._apply_view_update(ProjectViewUpdate(
+                clear_project_info=True,
+                success_message=f"**项目 '{project_name}' 已关闭**"
+            ))
             
             # 发出项目关闭事件
-            event = ControllerEvent(
-                event_type="project_closed",
-                source=self.name,
-                data={"project_name": project_name}
-            )
-            self.emit_event(event)
+            self._emit("project_closed", {"project_name": project_name})
             
             self.set_state(ControllerState.IDLE)
             return True
@@ -257,9 +428,14 @@ class NovelController(BaseController):
         """获取当前项目信息"""
         return self._current_project
     
-    def get_project_history(self) -> List[Dict[str, Any]]:
-        """获取项目历史"""
-        return self._project_history.copy()
+    def get_project_history(self) -> Tuple[Mapping[str, Any], ...]:
+        """获取项目历史（只读快照，历史未变化时重复调用返回同一对象）"""
+        snapshot = self._history_snapshot
+        if snapshot is None:
+            snapshot = self._history_snapshot = tuple(
+                MappingProxyType(item) for item in self._project_history.values()
+            )
+        return snapshot
     
     def update_project_config(self, updates: Dict[str, Any]) -> bool:
         """更新项目配置"""
@@ -269,44 +445,100 @@ class NovelController(BaseController):
             
             # 更新配置
             self._current_project["config"].update(updates)
-            self._current_project["config"]["last_modified"] = datetime.now().isoformat()
+            self._current_project["config"]["last_modified"] = _now_iso()
             
             # 更新UI
-            if hasattr(self.view, 'update_project_info'):
-                self.view.update_project_info(self._current_project["config"])
+            if self._view_update_project_info:
+                self._view_update_project_info(self._current_project["config"])
             
             # 发出配置更新事件
-            event = ControllerEvent(
-                event_type="project_config_updated",
-                source=self.name,
-                data={"updates": updates}
-            )
-            self.emit_event(event)
+            self._emit("project_config_updated", {"updates": updates})
             
+            self._schedule_project_save()
             return True
             
         except Exception as e:
             self._handle_error(e, "更新项目配置")
             return False
     
+    def _apply_view_update(self, update: ProjectViewUpdate):
+        """将一次操作的View更新整批提交"""
+        if self._view_apply_project_updates:
+            self._view_apply_project_updates(update)
+            return
+        
+        if update.clear_project_info and self._view_clear_project_info:
+            self._view_clear_project_info()
+        if update.project_info is not None and self._view_update_project_info:
+            self._view_update_project_info(update.project_info)
+        if update.project_files_path is not None and self._view_load_project_files:
+            self._view_load_project_files(update.project_files_path)
+        if update.success_message and self._view_show_success:
+            self._view_show_success(update.success_message)
+    
+    def _schedule_project_save(self):
+        """
+        标记项目已修改，并在自动保存开启时安排延迟保存
+        合并窗口内的多次修改只写盘一次。界面每次调用控制器都使用临时事件循环，
+        因此使用线程定时器而不是事件循环任务，调用所在的循环关闭后仍会保存
+        """
+        with self._save_lock:
+            self._project_dirty = True
+            timer = self._new_save_timer_locked()
+        if timer is not None:
+            timer.start()
+    
+    def _new_save_timer_locked(self) -> Optional[threading.Timer]:
+        """
+        在持有_save_lock时创建延迟保存定时器，已有待执行的保存或自动保存关闭时返回None
+        定时器为守护线程，不阻止程序退出；cleanup与关闭项目时会同步保存未写盘的修改
+        """
+        if not self._auto_save_enabled or self._pending_save is not None:
+            return None
+        timer = self._pending_save = threading.Timer(_AUTO_SAVE_DEBOUNCE_DELAY, self._auto_save_project)
+        timer.daemon = True
+        return timer
+    
+    def _cancel_pending_save(self):
+        """取消尚未触发的自动保存"""
+        with self._save_lock:
+            timer, self._pending_save = self._pending_save, None
+        if timer is not None:
+            timer.cancel()
+    
+    def _auto_save_project(self):
+        """自动保存项目配置（在定时器线程中执行），只写盘，不提示也不改变控制器状态"""
+        with self._save_lock:
+            self._pending_save = None
+            project = self._current_project
+            if not self._project_dirty or not project:
+                return
+            # 写盘期间的新修改会重新标记并安排下一次保存
+            self._project_dirty = False
+            config = dict(project["config"])
+        config_path = os.path.join(project["path"], _PROJECT_CONFIG_FILENAME)
+        if self._save_project_config(config_path, config):
+            return
+        with self._save_lock:
+            # 写盘失败且项目未切换时恢复修改标记并稍后重试
+            still_current = self._current_project is project
+            if still_current:
+                self._project_dirty = True
+            timer = self._new_save_timer_locked() if still_current else None
+        if timer is not None:
+            self.logger.warning("自动保存项目配置失败，将在%s秒后重试", _AUTO_SAVE_DEBOUNCE_DELAY)
+            timer.start()
+        else:
+            self.logger.warning("自动保存项目配置失败，修改将在下次保存时写入")
+    
     def get_project_files(self) -> List[str]:
         """获取项目文件列表"""
         if not self._current_project:
             return []
         
         try:
-            project_path = self._current_project["path"]
-            files = []
-            
             # 遍历项目目录
-            for root, dirs, filenames in os.walk(project_path):
-                for filename in filenames:
-                    if filename.endswith(('.txt', '.md', '.json')):
-                        file_path = os.path.join(root, filename)
-                        rel_path = os.path.relpath(file_path, project_path)
-                        files.append(rel_path)
-            
-            return files
+            return list(_iter_project_files(self._current_project["path"], self._listing_cache))
             
         except Exception as e:
             self.logger.error(f"获取项目文件列表失败: {e}")
@@ -314,23 +546,21 @@ class NovelController(BaseController):
     
     def _validate_project_data(self, project_data: Dict[str, Any]) -> bool:
         """验证项目数据"""
-        required_fields = ["project_name", "topic", "genre", "num_chapters", "word_number", "filepath"]
-        
-        for field in required_fields:
-            if field not in project_data or not project_data[field]:
-                self.logger.error(f"项目数据缺少必要字段: {field}")
-                if hasattr(self.view, 'show_error'):
-                    self.view.show_error(f"**参数错误**: 缺少{field}")
+        for field in _PROJECT_REQUIRED_FIELDS:
+            if not project_data.get(field):
+                self.logger.error("项目数据缺少必要字段: %s", field)
+                if self._view_show_error:
+                    self._view_show_error(f"**参数错误**: 缺少{field}")
                 return False
         
         # 验证数值字段
         try:
             int(project_data["num_chapters"])
             int(project_data["word_number"])
-        except ValueError:
+        except (TypeError, ValueError):
             self.logger.error("章节数或字数必须为数字")
-            if hasattr(self.view, 'show_error'):
-                self.view.show_error("**参数错误**: 章节数或字数必须为数字")
+            if self._view_show_error:
+                self._view_show_error("**参数错误**: 章节数或字数必须为数字")
             return False
         
         return True
@@ -341,20 +571,14 @@ class NovelController(BaseController):
             # 创建主目录
             os.makedirs(project_path, exist_ok=True)
             
-            # 创建子目录
-            subdirs = [
-                "architecture",      # 架构文件
-                "blueprints",       # 章节蓝图
-                "drafts",          # 章节草稿
-                "final_chapters",  # 最终章节
-                "characters",      # 角色信息
-                "settings",        # 设定信息
-                "resources"        # 资源文件
-            ]
-            
-            for subdir in subdirs:
+            # 主目录已存在，子目录直接mkdir，无需makedirs逐级检查父目录
+            for subdir in self._SUBDIRS:
                 subdir_path = os.path.join(project_path, subdir)
-                os.makedirs(subdir_path, exist_ok=True)
+                try:
+                    os.mkdir(subdir_path)
+                except FileExistsError:
+                    if not os.path.isdir(subdir_path):
+                        raise
             
             return True
             
@@ -365,22 +589,42 @@ class NovelController(BaseController):
     def _save_project_config(self, config_path: str, config: Dict[str, Any]) -> bool:
         """保存项目配置"""
         try:
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            with self._write_lock:
+                _atomic_write_bytes(config_path, _json_dumps_bytes(config))
+                st = os.stat(config_path)
+            self._cache_project_config(config_path, (st.st_mtime_ns, st.st_size), config)
             return True
         except Exception as e:
+            self._project_config_cache.pop(config_path, None)
             self.logger.error(f"保存项目配置失败: {e}")
             return False
     
+    def _cache_project_config(self, config_path: str, signature: Tuple[int, int], config: Dict[str, Any]) -> None:
+        """写入项目配置缓存，超出上限时淘汰最久未使用的条目"""
+        cache = self._project_config_cache
+        cache[config_path] = (signature, dict(config))
+        cache.move_to_end(config_path)
+        while len(cache) > _PROJECT_CONFIG_CACHE_SIZE:
+            cache.popitem(last=False)
+    
     def _load_project_config(self, config_path: str) -> Optional[Dict[str, Any]]:
-        """加载项目配置"""
+        """加载项目配置，文件未变化时返回缓存结果的副本"""
         try:
-            if not os.path.exists(config_path):
+            try:
+                st = os.stat(config_path)
+            except FileNotFoundError:
                 return None
             
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            signature = (st.st_mtime_ns, st.st_size)
+            cached = self._project_config_cache.get(config_path)
+            if cached is not None and cached[0] == signature:
+                self._project_config_cache.move_to_end(config_path)
+                return dict(cached[1])
             
+            with open(config_path, 'rb') as f:
+                config = _json_loads_bytes(f.read())
+            if isinstance(config, dict):
+                self._cache_project_config(config_path, signature, config)
             return config
             
         except Exception as e:
@@ -390,28 +634,28 @@ class NovelController(BaseController):
     def _load_project_history(self):
         """加载项目历史"""
         try:
-            history_path = os.path.join(os.path.expanduser("~"), ".novel_generator", "project_history.json")
-            
-            if os.path.exists(history_path):
-                with open(history_path, 'r', encoding='utf-8') as f:
-                    self._project_history = json.load(f)
-            else:
-                self._project_history = []
+            history = OrderedDict()
+            try:
+                with open(self._history_path, 'rb') as f:
+                    payload = f.read()
+            except FileNotFoundError:
+                payload = None
+            if payload is not None:
+                for item in _json_loads_bytes(payload):
+                    history.setdefault(item.get("path"), item)
+            self._project_history = history
+            self._history_snapshot = None
                 
         except Exception as e:
             self.logger.error(f"加载项目历史失败: {e}")
-            self._project_history = []
+            self._project_history = OrderedDict()
+            self._history_snapshot = None
     
     def _save_project_history(self):
         """保存项目历史"""
         try:
-            history_dir = os.path.join(os.path.expanduser("~"), ".novel_generator")
-            os.makedirs(history_dir, exist_ok=True)
-            
-            history_path = os.path.join(history_dir, "project_history.json")
-            
-            with open(history_path, 'w', encoding='utf-8') as f:
-                json.dump(self._project_history, f, ensure_ascii=False, indent=2)
+            os.makedirs(self._app_dir, exist_ok=True)
+            _atomic_write_bytes(self._history_path, _json_dumps_bytes(list(self._project_history.values())))
                 
         except Exception as e:
             self.logger.error(f"保存项目历史失败: {e}")
@@ -419,22 +663,18 @@ class NovelController(BaseController):
     def _add_to_project_history(self, project_path: str, project_name: str):
         """添加到项目历史"""
         try:
-            # 移除重复项
-            self._project_history = [
-                item for item in self._project_history 
-                if item.get("path") != project_path
-            ]
-            
-            # 添加新项到开头
-            self._project_history.insert(0, {
+            # 已存在的项目移到开头，记录更新为本次打开
+            self._project_history[project_path] = {
                 "path": project_path,
                 "name": project_name,
-                "last_opened": datetime.now().isoformat()
-            })
+                "last_opened": _now_iso()
+            }
+            self._project_history.move_to_end(project_path, last=False)
             
             # 限制历史记录数量
-            if len(self._project_history) > 10:
-                self._project_history = self._project_history[:10]
+            while len(self._project_history) > _MAX_PROJECT_HISTORY:
+                self._project_history.popitem(last=True)
+            self._history_snapshot = None
                 
         except Exception as e:
-            self.logger.error(f"添加项目历史失败: {e}")
\ No newline at end of file
+            self.logger.error(f"添加项目历史失败: {e}")
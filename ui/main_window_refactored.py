@@ -10,6 +10,7 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from typing import Any, Dict
+from dataclasses import asdict
 
 # 导入MVP基础类和配置模型
 from .mvp_base import BaseView, BasePresenter
@@ -335,7 +336,7 @@ class NovelGeneratorPresenter(BasePresenter):
         """设置角色库"""
         try:
             save_path = self.model.novel_params.filepath or "."
-            llm_adapter = create_llm_adapter(self.model.current_llm_config.__dict__)
+            llm_adapter = create_llm_adapter(asdict(self.model.current_llm_config))
             self.view._role_lib = RoleLibrary(self.view.master, save_path, llm_adapter)
         except Exception as e:
             logging.error(f"Failed to setup role library: {e}")
@@ -358,7 +359,7 @@ class NovelGeneratorPresenter(BasePresenter):
         try:
             if hasattr(self.view, '_role_lib'):
                 save_path = self.model.novel_params.filepath or "."
-                llm_adapter = create_llm_adapter(self.model.current_llm_config.__dict__)
+                llm_adapter = create_llm_adapter(asdict(self.model.current_llm_config))
                 self.view._role_lib = RoleLibrary(self.view.master, save_path, llm_adapter)
         except Exception as e:
             logging.error(f"Failed to update role library: {e}")